@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import script
+
+
+def create_sources(n, *, count=4):
+    sources = list()
+
+    for i in range(count):
+        source = {
+            "groups": [
+                {
+                    "name": f"group-{j}",
+                    "color": i,
+                    "labels": [{"name": f"label-{k}", "description": f"{i}"} for k in range(n // 100)],
+                }
+                for j in range(100)
+            ],
+            "labels": [{"name": f"label-{j}", "color": i} for j in range(n)],
+        }
+
+        sources.append(source)
+
+    return sources
+
+
+def main():
+    print(f"{'labels':>8}  {'seconds':>9}  {'us/label':>9}")
+
+    for n in (1000, 2000, 4000, 8000, 16000):
+        sources = create_sources(n)
+
+        start = time.perf_counter()
+        script._merge_sources(sources)
+        elapsed = time.perf_counter() - start
+
+        print(f"{n:>8}  {elapsed:>9.4f}  {elapsed / n * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import script
+
+CASES = [
+    [],
+    [("area", 1)],
+    [("area", 1), ("agent", 1)],
+    [("ab", 1), ("abc", 1)],
+    [("ab", 1), ("abc", 1), ("abcd", 1)],
+    [("area", 1), ("agent", 0)],
+    [("area", 0), ("agent", 0)],
+    [("area", 1), (None, 1), ("", 1)],
+    [("area", 1), ("area", 1)],
+    [("area", 1), ("area", 0), ("are", 1)],
+    [("a", 1), ("a", 1), ("ab", 0), ("b", 1)],
+]
+
+
+def create_groups(items):
+    return [{"name": name, "labels": [{"name": "label"}] * n} for (name, n) in items]
+
+
+def get_group_prefixes(groups):
+    prefixes = dict()
+
+    for group in groups:
+        group_name = group["name"]
+
+        if group_name:
+            group_prefix_length = 1
+            group_prefix = group_name[:group_prefix_length]
+            while any(g["name"].startswith(group_prefix) for g in groups if g["name"] and g["name"] != group_name and g["labels"]):
+                group_prefix_length += 1
+                group_prefix = group_name[:group_prefix_length]
+
+                if group_prefix == group_name:
+                    break
+
+            prefixes[group_name] = group_prefix
+
+    return prefixes
+
+
+def create_random_groups(rng, n):
+    items = list()
+
+    for _ in range(n):
+        name = "".join(rng.choice("ab") for _ in range(rng.randint(0, 4)))
+        items.append((name or rng.choice([None, ""]), rng.randint(0, 1)))
+
+    return create_groups(items)
+
+
+def check(groups):
+    expected = get_group_prefixes(groups)
+    actual = script._get_group_prefixes(groups)
+
+    if actual != expected:
+        raise AssertionError(f"{[(g['name'], len(g['labels'])) for g in groups]}: expected {expected}, got {actual}")
+
+
+def main():
+    for items in CASES:
+        check(create_groups(items))
+
+    rng = random.Random(0)
+
+    for _ in range(10000):
+        check(create_random_groups(rng, rng.randint(0, 12)))
+
+    print(f"{len(CASES)} fixed and 10000 random group sets match.")
+    print()
+    print(f"{'groups':>8}  {'before':>9}  {'after':>9}")
+
+    for n in (100, 200, 400, 800):
+        groups = create_groups(("".join(rng.choice(string.ascii_lowercase) for _ in range(8)), 1) for _ in range(n))
+
+        start = time.perf_counter()
+        get_group_prefixes(groups)
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        script._get_group_prefixes(groups)
+        after = time.perf_counter() - start
+
+        print(f"{n:>8}  {before:>9.4f}  {after:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,543 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import re
+import time
+
+from aiohttp import web
+
+
+_TOKEN_REGEX = re.compile(
+    r"""
+    (?P<ignored>[\s,]+|\#[^\n]*)
+    |(?P<punctuator>\.\.\.|[!$&():=@\[\]{|}])
+    |(?P<string>"(?:[^"\\]|\\.)*")
+    |(?P<number>-?[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)
+    |(?P<name>[_A-Za-z][_0-9A-Za-z]*)
+    """,
+    re.VERBOSE,
+)
+
+
+class GraphQLError(Exception):
+    def __init__(self, message, type="UNPROCESSABLE"):
+        super().__init__(message)
+        self.type = type
+
+
+class _Parser:
+    def __init__(self, document):
+        self.tokens = list()
+        self.position = 0
+
+        position = 0
+        while position < len(document):
+            match = _TOKEN_REGEX.match(document, position)
+            if not match:
+                raise GraphQLError(f"Unexpected character at {position}.", "PARSE_ERROR")
+
+            position = match.end()
+
+            kind = match.lastgroup
+            if kind == "ignored":
+                continue
+
+            value = match.group(kind)
+            if kind == "string":
+                value = json.loads(value)
+            elif kind == "number":
+                value = float(value) if any(c in value for c in ".eE") else int(value)
+
+            self.tokens.append((kind, value))
+
+    def peek(self):
+        try:
+            return self.tokens[self.position]
+        except IndexError:
+            return (None, None)
+
+    def take(self, kind, value=None):
+        token = self.peek()
+        if token[0] != kind or (value is not None and token[1] != value):
+            raise GraphQLError(f"Expected {value or kind}, got {token[1]!r}.", "PARSE_ERROR")
+
+        self.position += 1
+        return token[1]
+
+    def skip(self, value):
+        if self.peek() == ("punctuator", value):
+            self.position += 1
+            return True
+
+        return False
+
+    def parse_operation(self):
+        if self.peek() == ("punctuator", "{"):
+            return ("query", dict(), self.parse_selections())
+
+        kind = self.take("name")
+        if self.peek()[0] == "name":
+            self.take("name")
+
+        variables = dict()
+        if self.skip("("):
+            while not self.skip(")"):
+                self.take("punctuator", "$")
+                name = self.take("name")
+                self.take("punctuator", ":")
+                self.parse_type()
+                variables[name] = self.parse_value() if self.skip("=") else None
+
+        return (kind, variables, self.parse_selections())
+
+    def parse_type(self):
+        if self.skip("["):
+            self.parse_type()
+            self.take("punctuator", "]")
+        else:
+            self.take("name")
+
+        self.skip("!")
+
+    def parse_arguments(self):
+        arguments = dict()
+        if self.skip("("):
+            while not self.skip(")"):
+                name = self.take("name")
+                self.take("punctuator", ":")
+                arguments[name] = self.parse_value()
+
+        return arguments
+
+    def parse_selections(self):
+        self.take("punctuator", "{")
+
+        selections = list()
+        while not self.skip("}"):
+            if self.skip("..."):
+                self.take("name", "on")
+                selections.append(("fragment", self.take("name"), self.parse_selections()))
+                continue
+
+            alias = name = self.take("name")
+            if self.skip(":"):
+                name = self.take("name")
+
+            arguments = self.parse_arguments()
+
+            directives = list()
+            while self.skip("@"):
+                directives.append((self.take("name"), self.parse_arguments()))
+
+            children = self.parse_selections() if self.peek() == ("punctuator", "{") else None
+
+            selections.append(("field", alias, name, arguments, directives, children))
+
+        return selections
+
+    def parse_value(self):
+        kind, value = self.peek()
+
+        if (kind, value) == ("punctuator", "$"):
+            self.position += 1
+            return ("variable", self.take("name"))
+        elif (kind, value) == ("punctuator", "["):
+            self.position += 1
+
+            values = list()
+            while not self.skip("]"):
+                values.append(self.parse_value())
+
+            return ("list", values)
+        elif (kind, value) == ("punctuator", "{"):
+            self.position += 1
+
+            values = dict()
+            while not self.skip("}"):
+                name = self.take("name")
+                self.take("punctuator", ":")
+                values[name] = self.parse_value()
+
+            return ("object", values)
+
+        self.position += 1
+
+        if kind == "name":
+            value = {"true": True, "false": False, "null": None}.get(value, value)
+
+        return ("constant", value)
+
+
+def _evaluate(value, variables):
+    kind, value = value
+
+    if kind == "variable":
+        return variables.get(value, None)
+    elif kind == "list":
+        return [_evaluate(v, variables) for v in value]
+    elif kind == "object":
+        return {k: _evaluate(v, variables) for (k, v) in value.items()}
+    else:
+        return value
+
+
+class FakeGitHub:
+    """
+    An in-memory stand-in for the parts of the GitHub GraphQL API used by script.py.
+
+    Parameters
+    ----------
+    latency: float
+        A number of seconds to wait before answering each request.
+    error_rate: float
+        A probability with which a request is answered with a ``502``.
+    rate_limit: int
+        A number of requests allowed before ``RATE_LIMITED`` errors are returned.
+    max_concurrency: int
+        A number of requests allowed in flight before secondary rate limit ``403`` responses are
+        returned. ``0`` for no limit.
+    """
+
+    def __init__(self, *, latency=0, error_rate=0, rate_limit=5000, max_concurrency=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_limit_remaining = rate_limit
+        self.rate_limit_reset = int(time.time()) + 3600
+        self.max_concurrency = max_concurrency
+
+        self.repositories = dict()
+        self.nodes = dict()
+
+        self.request_n = 0
+        self.bytes_n = 0
+        self.in_flight = 0
+        self.operations = dict()
+
+        self._ids = itertools.count(1)
+
+    def add_repository(self, name_with_owner, *, archived=False):
+        repository = {
+            "id": f"R_{next(self._ids)}",
+            "nameWithOwner": name_with_owner,
+            "isArchived": archived,
+            "labels": dict(),
+        }
+
+        self.repositories[name_with_owner] = repository
+        self.nodes[repository["id"]] = (repository, None)
+
+        return repository
+
+    def add_label(self, repository, name, *, color="EDEDED", description=None):
+        label = {
+            "id": f"L_{next(self._ids)}",
+            "name": name,
+            "color": color,
+            "description": description,
+        }
+
+        repository["labels"][name] = label
+        self.nodes[label["id"]] = (repository, label)
+
+        return label
+
+    def _record(self, operation):
+        now = time.perf_counter()
+
+        n, first, _ = self.operations.get(operation, (0, now, now))
+        self.operations[operation] = (n + 1, first, now)
+
+    def _find(self, id):
+        try:
+            return self.nodes[id]
+        except KeyError:
+            pass
+
+        raise GraphQLError(f"Could not resolve to a node with the global id of '{id}'.", "NOT_FOUND")
+
+    def _paginate(self, items, arguments):
+        first = arguments.get("first", None) or 100
+        if first > 100:
+            raise GraphQLError("Requesting more than 100 records on a connection is not allowed.", "MAX_NODE_LIMIT_EXCEEDED")
+
+        start = int(arguments["after"]) if arguments.get("after", None) else 0
+        end = min(start + first, len(items))
+
+        return {
+            "totalCount": len(items),
+            "pageInfo": {"endCursor": str(end), "hasNextPage": end < len(items)},
+            "nodes": items[start:end],
+        }
+
+    def _label(self, label):
+        return {"__typename": "Label", **label}
+
+    def _repository(self, repository):
+        def labels(arguments):
+            self._record("labels")
+
+            labels = [self._label(repository["labels"][name]) for name in sorted(repository["labels"].keys())]
+            return self._paginate(labels, arguments)
+
+        def label(arguments):
+            label = repository["labels"].get(arguments["name"], None)
+            return None if label is None else self._label(label)
+
+        owner, name = repository["nameWithOwner"].split("/")
+
+        return {
+            "__typename": "Repository",
+            "id": repository["id"],
+            "isArchived": repository["isArchived"],
+            "name": name,
+            "nameWithOwner": repository["nameWithOwner"],
+            "label": label,
+            "labels": labels,
+        }
+
+    def _query(self):
+        def repository(arguments):
+            self._record("repository")
+
+            name_with_owner = f"{arguments['owner']}/{arguments['name']}"
+
+            try:
+                return self._repository(self.repositories[name_with_owner])
+            except KeyError:
+                raise GraphQLError(f"Could not resolve to a Repository with the name '{name_with_owner}'.", "NOT_FOUND") from None
+
+        def repository_owner(arguments):
+            def repositories(arguments_):
+                self._record("repositories")
+
+                names = sorted(n for n in self.repositories.keys() if n.split("/")[0] == arguments["login"])
+                return self._paginate([self._repository(self.repositories[n]) for n in names], arguments_)
+
+            return {"__typename": "Organization", "login": arguments["login"], "repositories": repositories}
+
+        def node(arguments):
+            repository, label = self._find(arguments["id"])
+            return self._repository(repository) if label is None else self._label(label)
+
+        reset_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.rate_limit_reset))
+
+        return {
+            "__typename": "Query",
+            "node": node,
+            "rateLimit": {"cost": 1, "limit": self.rate_limit, "remaining": self.rate_limit_remaining, "resetAt": reset_at},
+            "repository": repository,
+            "repositoryOwner": repository_owner,
+        }
+
+    def _mutation(self):
+        def create_label(arguments):
+            self._record("createLabel")
+
+            input = arguments["input"]
+
+            repository, label = self._find(input["repositoryId"])
+            if label is not None:
+                raise GraphQLError(f"Could not resolve to a Repository with the global id of '{input['repositoryId']}'.", "NOT_FOUND")
+
+            if input["name"] in repository["labels"].keys():
+                raise GraphQLError("Name has already been taken")
+
+            label = self.add_label(repository, input["name"], color=input.get("color", None) or "EDEDED", description=input.get("description", None))
+
+            return {"__typename": "CreateLabelPayload", "label": self._label(label)}
+
+        def update_label(arguments):
+            self._record("updateLabel")
+
+            input = arguments["input"]
+
+            repository, label = self._find(input["id"])
+            if label is None:
+                raise GraphQLError(f"Could not resolve to a Label with the global id of '{input['id']}'.", "NOT_FOUND")
+
+            if "name" in input.keys() and input["name"] != label["name"]:
+                if input["name"] in repository["labels"].keys():
+                    raise GraphQLError("Name has already been taken")
+
+                del repository["labels"][label["name"]]
+                label["name"] = input["name"]
+                repository["labels"][label["name"]] = label
+
+            for key in ("color", "description"):
+                if key in input.keys():
+                    label[key] = input[key]
+
+            return {"__typename": "UpdateLabelPayload", "label": self._label(label)}
+
+        def delete_label(arguments):
+            self._record("deleteLabel")
+
+            input = arguments["input"]
+
+            repository, label = self._find(input["id"])
+            if label is None:
+                raise GraphQLError(f"Could not resolve to a Label with the global id of '{input['id']}'.", "NOT_FOUND")
+
+            del repository["labels"][label["name"]]
+            del self.nodes[label["id"]]
+
+            return {"__typename": "DeleteLabelPayload"}
+
+        return {
+            "__typename": "Mutation",
+            "createLabel": create_label,
+            "deleteLabel": delete_label,
+            "updateLabel": update_label,
+        }
+
+    def _complete(self, value, selections, variables, path, errors):
+        if value is None or selections is None:
+            return value
+
+        if isinstance(value, list):
+            return [self._complete(v, selections, variables, [*path, i], errors) for (i, v) in enumerate(value)]
+
+        data = dict()
+
+        for selection in selections:
+            if selection[0] == "fragment":
+                _, type, children = selection
+
+                if value.get("__typename", None) == type:
+                    data.update(self._complete(value, children, variables, path, errors))
+
+                continue
+
+            _, alias, name, arguments, directives, children = selection
+
+            included = True
+            for (directive, directive_arguments) in directives:
+                condition = _evaluate(directive_arguments["if"], variables)
+
+                if directive == "include" and not condition or directive == "skip" and condition:
+                    included = False
+
+            if not included:
+                continue
+
+            try:
+                if name not in value.keys():
+                    raise GraphQLError(f"Field '{name}' doesn't exist on type '{value.get('__typename', None)}'", "undefinedField")
+
+                field = value[name]
+                if callable(field):
+                    field = field({k: _evaluate(v, variables) for (k, v) in arguments.items()})
+
+                data[alias] = self._complete(field, children, variables, [*path, alias], errors)
+            except GraphQLError as e:
+                data[alias] = None
+                errors.append({"type": e.type, "path": [*path, alias], "message": str(e)})
+
+        return data
+
+    def execute(self, document, variables=None):
+        """
+        Executes a GraphQL document against the fake.
+
+        Returns
+        -------
+        :class:`dict`
+            The response body.
+        """
+
+        try:
+            parser = _Parser(document)
+            kind, defaults, selections = parser.parse_operation()
+        except GraphQLError as e:
+            return {"errors": [{"type": e.type, "message": str(e)}]}
+
+        variables = {**defaults, **(variables or dict())}
+
+        root = self._mutation() if kind == "mutation" else self._query()
+
+        errors = list()
+        data = self._complete(root, selections, variables, list(), errors)
+
+        response = {"data": data}
+        if errors:
+            response["errors"] = errors
+
+        return response
+
+    async def _handle(self, request):
+        self.request_n += 1
+        self.in_flight += 1
+
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+
+            body = await request.read()
+            self.bytes_n += len(body)
+
+            headers = {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self.rate_limit_remaining),
+                "X-RateLimit-Reset": str(self.rate_limit_reset),
+            }
+
+            if self.max_concurrency and self.in_flight > self.max_concurrency:
+                body = {"message": "You have exceeded a secondary rate limit. Please wait a few minutes before you try again."}
+                return web.json_response(body, status=403, headers={**headers, "Retry-After": "1"})
+
+            if self.error_rate and random.random() < self.error_rate:
+                return web.Response(status=502, text="Bad Gateway")
+
+            if self.rate_limit_remaining <= 0:
+                body = {"errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded."}]}
+                return web.json_response(body, headers=headers)
+
+            self.rate_limit_remaining -= 1
+            headers["X-RateLimit-Remaining"] = str(self.rate_limit_remaining)
+
+            body = json.loads(body)
+            response = web.json_response(self.execute(body["query"], body.get("variables", None)), headers=headers)
+            self.bytes_n += len(response.body)
+
+            return response
+        finally:
+            self.in_flight -= 1
+
+    def create_application(self):
+        """
+        Creates an :class:`aiohttp.web.Application` serving the fake at ``/graphql``.
+        """
+
+        application = web.Application()
+        application.router.add_post("/graphql", self._handle)
+
+        return application
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A stand-in for the GitHub GraphQL API.")
+    parser.add_argument("--error-rate", default=0, type=float)
+    parser.add_argument("--labels", default=0, type=int)
+    parser.add_argument("--latency", default=0, type=float)
+    parser.add_argument("--max-concurrency", default=0, type=int)
+    parser.add_argument("--port", default=8080, type=int)
+    parser.add_argument("--rate-limit", default=5000, type=int)
+    parser.add_argument("--repository", action="append", default=list(), dest="repositories")
+    args = parser.parse_args()
+
+    github = FakeGitHub(latency=args.latency, error_rate=args.error_rate, rate_limit=args.rate_limit, max_concurrency=args.max_concurrency)
+
+    for name_with_owner in args.repositories:
+        repository = github.add_repository(name_with_owner)
+
+        for i in range(args.labels):
+            github.add_label(repository, f"label-{i}")
+
+    web.run_app(github.create_application(), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+from server import FakeGitHub
+
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "script.py")
+
+
+def create_source(n):
+    lines = ["labels:"]
+
+    for i in range(n):
+        lines.append(f"  label-{i}:")
+        lines.append("    color: 0x00FF00")
+        lines.append(f"    description: Label {i}")
+
+    return "\n".join(lines) + "\n"
+
+
+def populate(github, name_with_owner, n):
+    repository = github.add_repository(name_with_owner)
+
+    for i in range(n * 3 // 4):
+        color = "00FF00" if i < n // 2 else "FF0000"
+        github.add_label(repository, f"label-{i}", color=color, description=f"Label {i}")
+
+    for i in range(n // 4):
+        github.add_label(repository, f"stale-{i}")
+
+
+async def run(label_n, repository_n, *, latency, arguments):
+    github = FakeGitHub(latency=latency, rate_limit=10**9)
+
+    repositories = [f"benchmark/repository-{i}" for i in range(repository_n)]
+    for repository in repositories:
+        populate(github, repository, label_n)
+
+    runner = web.AppRunner(github.create_application())
+    await runner.setup()
+
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+
+    _, port = runner.addresses[0][:2]
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "labels.yml")
+            with open(source, "w") as stream:
+                stream.write(create_source(label_n))
+
+            listing = os.path.join(directory, "repositories.txt")
+            with open(listing, "w") as stream:
+                stream.write("\n".join(repositories) + "\n")
+
+            start = time.perf_counter()
+
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                SCRIPT,
+                "--endpoint",
+                f"http://127.0.0.1:{port}/graphql",
+                "--repository",
+                f"@{listing}",
+                "--source",
+                source,
+                "--token",
+                "benchmark",
+                "--verbosity",
+                "1",
+                *arguments,
+            )
+
+            code = await process.wait()
+
+            elapsed = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+
+    expected = {f"label-{i}" for i in range(label_n)}
+    synchronized = all(
+        repository["labels"].keys() == expected and all(label["color"] == "00FF00" for label in repository["labels"].values())
+        for repository in github.repositories.values()
+    )
+
+    phases = {operation: last - first for (operation, (_, first, last)) in github.operations.items()}
+
+    if code:
+        result = f"exit {code}"
+    elif synchronized:
+        result = "ok"
+    else:
+        result = "diff"
+
+    return (result, elapsed, github.request_n, github.bytes_n, phases)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks script.py against a stand-in for the GitHub GraphQL API.")
+    parser.add_argument("--labels", default=[10, 1000, 10000], nargs="+", type=int)
+    parser.add_argument("--latency", default=0.05, type=float)
+    parser.add_argument("--repositories", default=[1, 100], nargs="+", type=int)
+    args, arguments = parser.parse_known_args()
+
+    phase_names = ("labels", "deleteLabel", "updateLabel", "createLabel")
+
+    print(f"{'labels':>6} {'repos':>5} {'result':>6} {'seconds':>8} {'requests':>8} {'bytes':>10}" + "".join(f" {n:>11}" for n in phase_names))
+
+    for label_n in args.labels:
+        for repository_n in args.repositories:
+            result, elapsed, request_n, bytes_n, phases = asyncio.run(run(label_n, repository_n, latency=args.latency, arguments=arguments))
+
+            line = f"{label_n:>6} {repository_n:>5} {result:>6} {elapsed:>8.2f} {request_n:>8} {bytes_n:>10}"
+            line += "".join(f" {phases.get(n, 0):>11.2f}" for n in phase_names)
+
+            print(line, flush=True)
+
+
+if __name__ == "__main__":
+    main()
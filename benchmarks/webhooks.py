@@ -0,0 +1,186 @@
+import argparse
+import asyncio
+import glob
+import hashlib
+import hmac
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+from server import FakeGitHub
+from sync import SCRIPT, create_source
+
+
+PAYLOADS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads")
+
+
+def replay(github, payload):
+    repository = github.repositories[payload["repository"]["full_name"]]
+    label = payload["label"]
+
+    old_name = payload.get("changes", dict()).get("name", dict()).get("from", label["name"])
+
+    if payload["action"] == "created":
+        github.add_label(repository, label["name"], color=label["color"].upper(), description=label["description"])
+    elif payload["action"] == "edited":
+        existing = repository["labels"].pop(old_name)
+        existing.update(name=label["name"], color=label["color"].upper(), description=label["description"])
+        repository["labels"][label["name"]] = existing
+    elif payload["action"] == "deleted":
+        existing = repository["labels"].pop(label["name"])
+        del github.nodes[existing["id"]]
+
+
+def populate(github, name_with_owner, n):
+    repository = github.add_repository(name_with_owner)
+
+    for i in range(n):
+        github.add_label(repository, f"label-{i}", color="00FF00", description=f"Label {i}")
+
+    return repository
+
+
+def get_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+
+            await asyncio.sleep(0.05)
+        else:
+            writer.close()
+            return
+
+
+async def run(paths, label_n, *, debounce, latency, secret, arguments):
+    github = FakeGitHub(latency=latency, rate_limit=10**9)
+    repository = populate(github, "benchmark/repository-0", label_n)
+
+    runner = web.AppRunner(github.create_application())
+    await runner.setup()
+
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+
+    _, port = runner.addresses[0][:2]
+    serve_port = get_port()
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "labels.yml")
+            with open(source, "w") as stream:
+                stream.write(create_source(label_n))
+
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                SCRIPT,
+                "--debounce",
+                str(debounce),
+                "--endpoint",
+                f"http://127.0.0.1:{port}/graphql",
+                "--repository",
+                "benchmark/*",
+                "--serve",
+                f"127.0.0.1:{serve_port}",
+                "--source",
+                source,
+                "--token",
+                "benchmark",
+                "--verbosity",
+                "1",
+                "--webhook-secret",
+                secret,
+                *arguments,
+            )
+
+            try:
+                await wait_for_port(serve_port)
+
+                request_n = github.request_n
+                start = time.perf_counter()
+
+                async with aiohttp.ClientSession() as session:
+                    for path in paths:
+                        with open(path, "r") as stream:
+                            payload = json.load(stream)
+
+                        replay(github, payload)
+
+                        body = json.dumps(payload).encode()
+                        headers = {
+                            "Content-Type": "application/json",
+                            "X-GitHub-Event": "label",
+                            "X-Hub-Signature-256": "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest(),
+                        }
+
+                        async with session.post(f"http://127.0.0.1:{serve_port}/", data=body, headers=headers) as response:
+                            if response.status != 202:
+                                raise RuntimeError(f"{os.path.basename(path)} was answered with {response.status}.")
+
+                    expected = {f"label-{i}" for i in range(label_n)}
+
+                    while time.perf_counter() - start < debounce + 10:
+                        await asyncio.sleep(0.05)
+
+                        if repository["labels"].keys() == expected and all(label["color"] == "00FF00" for label in repository["labels"].values()):
+                            break
+
+                elapsed = time.perf_counter() - start
+            finally:
+                process.terminate()
+                code = await process.wait()
+    finally:
+        await runner.cleanup()
+
+    synchronized = repository["labels"].keys() == expected and all(label["color"] == "00FF00" for label in repository["labels"].values())
+
+    if code:
+        result = f"exit {code}"
+    elif synchronized:
+        result = "ok"
+    else:
+        result = "diff"
+
+    return (result, elapsed, github.request_n - request_n)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replays recorded label webhooks against script.py --serve and a stand-in for the GitHub GraphQL API."
+    )
+    parser.add_argument("--debounce", default=0.5, type=float)
+    parser.add_argument("--labels", default=[10, 1000], nargs="+", type=int)
+    parser.add_argument("--latency", default=0.05, type=float)
+    parser.add_argument("--payload", action="append", dest="payloads")
+    args, arguments = parser.parse_known_args()
+
+    paths = args.payloads or sorted(glob.glob(os.path.join(PAYLOADS, "*.json")))
+
+    print(f"{'labels':>6} {'events':>6} {'result':>6} {'seconds':>8} {'requests':>8}")
+
+    for label_n in args.labels:
+        result, elapsed, request_n = asyncio.run(
+            run(paths, label_n, debounce=args.debounce, latency=args.latency, secret="benchmark", arguments=arguments)
+        )
+
+        print(f"{label_n:>6} {len(paths):>6} {result:>6} {elapsed:>8.2f} {request_n:>8}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,605 +1,2477 @@
 import argparse
 import asyncio
+import atexit
+import bisect
 import collections
-import colorsys
+import datetime
+import hashlib
+import hmac
+import importlib
+import json
+import os
+import random
 import re
+import signal
 import sys
-import textwrap
+import time
 import traceback
 
-import aiohttp
-import graphql
-import yaml
 
-try:
-    from yaml import CSafeLoader as Loader
-except ImportError:
-    from yaml import SafeLoader as Loader
+class _LazyModule:
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attribute):
+        module = importlib.import_module(self._name)
+        globals()[self._name] = module
+
+        return getattr(module, attribute)
+
+
+aiohttp = _LazyModule("aiohttp")
+colorsys = _LazyModule("colorsys")
+graphql = _LazyModule("graphql")
+textwrap = _LazyModule("textwrap")
+yaml = _LazyModule("yaml")
+
+
+def _load_yaml(content):
+    try:
+        loader = yaml.CSafeLoader
+    except AttributeError:
+        loader = yaml.SafeLoader
+
+    return yaml.load(content, loader)
 
 
 _VersionInfo = collections.namedtuple("_VersionInfo", "major minor micro release serial")
 
-version = "1.2.3"
-version_info = _VersionInfo(1, 2, 3, "final", 0)
+version = "1.2.3"
+version_info = _VersionInfo(1, 2, 3, "final", 0)
+
+
+_ESCAPE_REGEX = re.compile("\x1B\\[[0-9;]+m")
+
+
+class _Output:
+    def __init__(self, *, interval=0.25, size=65536):
+        self.format = "text"
+
+        self._interval = interval
+        self._size = size
+
+        self._file = None
+        self._chunks = list()
+        self._chunks_n = 0
+        self._flushed_at = time.monotonic()
+        self._flush_handle = None
+
+        self._last_id = None
+        self._last_suffix = None
+        self._last_record = None
+
+    def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if self._chunks:
+            self._file.write("".join(self._chunks))
+            self._chunks.clear()
+            self._chunks_n = 0
+
+        if self._file is not None:
+            self._file.flush()
+
+        self._flushed_at = time.monotonic()
+
+    def write(self, string, *, file):
+        if file is not self._file:
+            self.flush()
+            self._file = file
+
+        self._chunks.append(string)
+        self._chunks_n += len(string)
+
+        if file is not sys.stdout or self._chunks_n >= self._size or time.monotonic() - self._flushed_at >= self._interval:
+            self.flush()
+        elif self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+            else:
+                self._flush_handle = loop.call_later(self._interval, self.flush)
+
+    def write_text(self, id, prefix, indent, suffix, string, e, *, end, file):
+        previous = ""
+        if id and self._last_id == id:
+            prefix = None
+        elif self._last_id:
+            previous = self._last_suffix + "\n"
+
+        self._last_id = None
+
+        if not end.endswith("\n"):
+            self._last_id = id
+            self._last_suffix = suffix
+            suffix = None
+
+        if prefix:
+            string = prefix + string
+
+        if suffix:
+            string += suffix
+
+        if e is not None:
+            if string:
+                if not string.endswith("\n"):
+                    string += " "
+
+                string += "See the error output below.\n\n"
+
+            string += "".join(traceback.format_exception(type(e), e, e.__traceback__))
+
+        if prefix and "\n" in string:
+            string = textwrap.indent(string, indent)[len(indent) :]
+
+        self.write(previous + string + end, file=file)
+
+    def close(self):
+        if self._last_record is not None:
+            record, file = self._last_record
+            self._last_record = None
+
+            self.write(json.dumps(record) + "\n", file=file)
+
+        self.flush()
+
+    def write_record(self, id, string, e, *, end, file):
+        if self._last_record is not None and self._last_record[0]["level"] == id:
+            record, _ = self._last_record
+        else:
+            self.close()
+
+            record = {"time": datetime.datetime.now(datetime.timezone.utc).isoformat(), "level": id, "message": ""}
+
+        record["message"] += _ESCAPE_REGEX.sub("", string)
+
+        if e is not None:
+            record["error"] = "".join(traceback.format_exception(type(e), e, e.__traceback__))
+
+        if end.endswith("\n"):
+            self._last_record = None
+            self.write(json.dumps(record) + "\n", file=file)
+        else:
+            self._last_record = (record, file)
+            record["message"] += end
+
+
+_output = _Output()
+_printers = list()
+
+atexit.register(_output.close)
+
+
+def _create_printer(*, id=None, level=None, prefix=None, suffix=None, stream=sys.stdout):
+    prefix = str(prefix) if prefix else ""
+    suffix = str(suffix) if suffix else ""
+    indent = " " * len(_ESCAPE_REGEX.sub("", prefix))
+
+    def printer(*args, end="\n", file=stream, flush=False, sep=" "):
+        if not printer.is_active:
+            return
+
+        e = None
+        if args and isinstance(args[-1], BaseException):
+            *args, e = args
+
+        string = sep.join([a if isinstance(a, str) else repr(a) for a in args])
+
+        if _output.format == "json":
+            _output.write_record(id, string, e, end=end, file=file)
+        else:
+            _output.write_text(id, prefix, indent, suffix, string, e, end=end, file=file)
+
+        if flush:
+            _output.flush()
+
+    printer.is_active = True
+    if level is not None:
+        printer.level = level
+        printer.is_active = False
+
+        _printers.append(printer)
+
+    return printer
+
+
+print_debug = _create_printer(id="DEBUG", level=4, prefix="  \x1B[32m[DEBUG]\x1B[39m ")
+print_info = _create_printer(id="INFO", level=3, prefix="   \x1B[34m[INFO]\x1B[39m ")
+print_warning = _create_printer(id="WARNING", level=2, prefix="\x1B[33m[WARNING]\x1B[39m ")
+print_error = _create_printer(id="ERROR", level=1, prefix="  \x1B[31m[ERROR]\x1B[39m", stream=sys.stderr)
+print_fatal = _create_printer(id="FATAL", level=1, prefix="  \x1B[31m[FATAL] ", stream=sys.stderr, suffix="\x1B[39m")
+
+
+class _Dispatcher:
+    def __init__(self, *, concurrency):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks = list()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def submit(self, function, *args, **kwargs):
+        async def run():
+            async with self._semaphore:
+                return await function(*args, **kwargs)
+
+        task = asyncio.ensure_future(run())
+        self._tasks.append(task)
+
+        return task
+
+
+_COLOR_REGEX = re.compile("([a-z]+)((?:[+-][rgbhsv][0-9]+)*)", re.IGNORECASE)
+_COLOR_OFFSET_REGEX = re.compile("([+-])([rgbhsv])([0-9]+)", re.IGNORECASE)
+
+
+# fmt: off
+MUTATE_LABEL_CREATE = "mutation($input:CreateLabelInput!){createLabel(input:$input){__typename}}"
+MUTATE_LABEL_DELETE = "mutation($input:DeleteLabelInput!){deleteLabel(input:$input){__typename}}"
+MUTATE_LABEL_UPDATE = "mutation($input:UpdateLabelInput!){updateLabel(input:$input){__typename}}"
+QUERY_REPOSITORY = "query($color:Boolean!,$description:Boolean!,$name:String!,$owner:String!){rateLimit{cost,remaining,resetAt}repository(owner:$owner,name:$name){id,labels(first:100){pageInfo{endCursor,hasNextPage}nodes{color@include(if:$color),description@include(if:$description),id,name}}}}"
+QUERY_REPOSITORY_OWNER_REPOSITORIES_PAGE = "query($cursor:String,$login:String!){rateLimit{cost,remaining,resetAt}repositoryOwner(login:$login){repositories(after:$cursor,first:100,ownerAffiliations:[OWNER]){pageInfo{endCursor,hasNextPage}nodes{isArchived,nameWithOwner}}}}"
+QUERY_REPOSITORY_LABELS_PAGE = "query($color:Boolean!,$cursor:String,$description:Boolean!,$repository_id:ID!){rateLimit{cost,remaining,resetAt}node(id:$repository_id){...on Repository{labels(after:$cursor,first:100){pageInfo{endCursor,hasNextPage}nodes{color@include(if:$color),description@include(if:$description),id,name}}}}}"
+# fmt: on
+
+_MUTATION_FIELDS = {
+    MUTATE_LABEL_CREATE: ("createLabel", "CreateLabelInput"),
+    MUTATE_LABEL_DELETE: ("deleteLabel", "DeleteLabelInput"),
+    MUTATE_LABEL_UPDATE: ("updateLabel", "UpdateLabelInput"),
+}
+
+
+_STATE_SAMPLE_N = 10
+_AUDIT_DIVERGENCE_N = 10
+_REPOSITORY_BATCH_N = 20
+
+
+class _BatchError(Exception):
+    pass
+
+
+class _Report:
+    def __init__(self, *, audit=False, plan=False):
+        self.started = time.perf_counter()
+
+        self.phases = dict()
+        self.repositories = dict()
+
+        self.plan = plan
+
+        if audit:
+            self.counts = ("missing", "mismatched", "extra", "matching")
+            self.divergences = collections.Counter()
+        elif plan:
+            self.counts = ("creations", "updates", "deletions", "skipped")
+            self.divergences = None
+        else:
+            self.counts = ("created", "updated", "deleted", "skipped")
+            self.divergences = None
+
+        self.request_n = 0
+        self.bytes_sent_n = 0
+        self.bytes_received_n = 0
+
+        self.graphql_request_n = 0
+        self.retry_n = 0
+        self.cost = 0
+
+    def get_repository(self, repository):
+        try:
+            return self.repositories[repository]
+        except KeyError:
+            data = {"phases": dict(), **{key: 0 for key in self.counts}, "failed": False}
+            self.repositories[repository] = data
+            return data
+
+    def record_counts(self, repository, counts):
+        data = self.get_repository(repository)
+
+        if counts is None:
+            data["failed"] = True
+        else:
+            data.update(zip(self.counts, counts))
+
+    def record_divergences(self, *, update, delete, create, renamed):
+        renamed_names = set(renamed.values())
+
+        for (old_name, new_name) in renamed.items():
+            self.divergences[f"renamed label '{old_name}' to '{new_name}'"] += 1
+
+        for (name, data) in update:
+            if name not in renamed_names:
+                for key in sorted(data.keys() - {"id"}):
+                    self.divergences[f"different {key} on label '{name}'"] += 1
+
+        for (name, _) in delete:
+            self.divergences[f"extra label '{name}'"] += 1
+
+        for (name, _) in create:
+            self.divergences[f"missing label '{name}'"] += 1
+
+    def record(self, phase, started, *, repository=None):
+        phases = self.phases if repository is None else self.get_repository(repository)["phases"]
+        phases[phase] = phases.get(phase, 0) + time.perf_counter() - started
+
+    def create_trace_config(self):
+        async def on_request_end(session, context, params):
+            self.request_n += 1
+
+        async def on_request_chunk_sent(session, context, params):
+            self.bytes_sent_n += len(params.chunk)
+
+        async def on_response_chunk_received(session, context, params):
+            self.bytes_received_n += len(params.chunk)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+        trace_config.on_response_chunk_received.append(on_response_chunk_received)
+
+        return trace_config
+
+    def to_dict(self):
+        return {
+            "version": version,
+            "elapsed": time.perf_counter() - self.started,
+            "phases": self.phases,
+            "requests": {
+                "http": self.request_n,
+                "graphql": self.graphql_request_n,
+                "retries": self.retry_n,
+                "cost": self.cost,
+                "bytes_sent": self.bytes_sent_n,
+                "bytes_received": self.bytes_received_n,
+            },
+            "plan": self.plan,
+            "repositories": self.repositories,
+            **({"divergences": dict(self.divergences.most_common())} if self.divergences is not None else dict()),
+        }
+
+    def to_markdown(self):
+        data = self.to_dict()
+
+        lines = [
+            f"### ShineyDev/sync-labels-action v{version}",
+            "",
+            f"Finished in {data['elapsed']:.2f} seconds with {self.graphql_request_n} GitHub requests "
+            f"({self.retry_n} retried, {self.cost} points), {self.request_n} HTTP requests in total, "
+            f"{self.bytes_sent_n} bytes sent and {self.bytes_received_n} bytes received.",
+            *(["", "This is a plan, and no labels were changed."] if self.plan else list()),
+            "",
+            "| Phase | Seconds |",
+            "| :-- | --: |",
+            *(f"| {phase} | {elapsed:.3f} |" for (phase, elapsed) in self.phases.items()),
+        ]
+
+        if self.repositories:
+            phase_names = ("fetch",) if self.divergences is not None or self.plan else ("fetch", "update", "delete", "create")
+            columns = [key.title() for key in self.counts] + [phase.title() for phase in phase_names]
+
+            lines.extend(
+                [
+                    "",
+                    "| Repository | " + " | ".join(columns) + " |",
+                    "| :-- |" + " --: |" * len(columns),
+                ]
+            )
+
+            for (repository, data) in self.repositories.items():
+                if data["failed"]:
+                    counts = "| failed | | | "
+                else:
+                    counts = "".join(f"| {data[key]} " for key in self.counts)
+
+                phases = " ".join(f"| {data['phases'].get(phase, 0):.3f}" for phase in phase_names)
+
+                lines.append(f"| {repository} {counts}{phases} |")
+
+        if self.divergences:
+            lines.extend(
+                [
+                    "",
+                    "| Divergence | Repositories |",
+                    "| :-- | --: |",
+                    *(f"| {divergence} | {n} |" for (divergence, n) in self.divergences.most_common(_AUDIT_DIVERGENCE_N)),
+                ]
+            )
+
+        return "\n".join(lines) + "\n"
+
+
+def _get_json_functions():
+    try:
+        import orjson
+    except ImportError:
+        return (json.dumps, json.loads)
+
+    return (lambda obj: orjson.dumps(obj).decode(), orjson.loads)
+
+
+def _create_session(*, connections=1, report=None, timeout=60):
+    dumps, loads = _get_json_functions()
+
+    class ClientResponse(aiohttp.ClientResponse):
+        async def json(self, *, loads=loads, **kwargs):
+            return await super().json(loads=loads, **kwargs)
+
+    connector = aiohttp.TCPConnector(
+        keepalive_timeout=60,
+        limit=0,
+        limit_per_host=max(connections, 8),
+        ttl_dns_cache=600,
+    )
+
+    return aiohttp.ClientSession(
+        connector=connector,
+        json_serialize=dumps,
+        response_class=ClientResponse,
+        timeout=aiohttp.ClientTimeout(connect=timeout, sock_read=timeout),
+        trace_configs=[report.create_trace_config()] if report is not None else None,
+    )
+
+
+class _Scheduler:
+    def __init__(self, client, *, concurrency, report, retries):
+        self._client = client
+        self._report = report
+        self._concurrency = concurrency
+        self._retries = retries
+
+        self._condition = asyncio.Condition()
+        self._in_flight = 0
+        self._window = concurrency
+        self._successes = 0
+        self._resume_at = 0
+
+    async def _acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self._window)
+            self._in_flight += 1
+
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _release(self, *, throttled):
+        async with self._condition:
+            self._in_flight -= 1
+
+            if throttled:
+                self._window = max(self._window // 2, 1)
+                self._successes = 0
+            else:
+                self._successes += 1
+
+                if self._successes >= self._window and self._window < self._concurrency:
+                    self._window += 1
+                    self._successes = 0
+
+            self._condition.notify_all()
+
+    def _pause(self, delay):
+        self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+    def _inspect(self, e, *, idempotent):
+        response = getattr(e, "response", None)
+
+        status = getattr(response, "status", None)
+        headers = getattr(response, "headers", dict())
+
+        delay = None
+
+        try:
+            delay = float(headers["Retry-After"])
+        except (KeyError, ValueError):
+            pass
+
+        if headers.get("X-RateLimit-Remaining", None) == "0":
+            try:
+                delay = max(int(headers["X-RateLimit-Reset"]) - time.time(), 0)
+            except (KeyError, ValueError):
+                pass
+
+        errors = (getattr(e, "data", None) or dict()).get("errors", list())
+
+        if delay is not None or status == 429 or any(error.get("type", None) == "RATE_LIMITED" for error in errors):
+            throttled = True
+            retriable = True
+        elif status == 403 and "rate limit" in str(e).lower():
+            throttled = True
+            retriable = True
+        elif status in (502, 503, 504):
+            throttled = False
+            retriable = idempotent
+        else:
+            throttled = False
+            retriable = False
+
+        return (delay, throttled, retriable)
+
+    def _observe(self, data):
+        try:
+            rate_limit = data["rateLimit"]
+            remaining = rate_limit["remaining"]
+            reset_at = datetime.datetime.strptime(rate_limit["resetAt"], "%Y-%m-%dT%H:%M:%SZ")
+        except (KeyError, TypeError, ValueError):
+            return
+
+        self._report.cost += rate_limit.get("cost", 0)
+
+        if remaining < max(rate_limit.get("cost", 1), 1) * self._window:
+            delay = reset_at.replace(tzinfo=datetime.timezone.utc).timestamp() - time.time()
+            if delay > 0:
+                print_warning(f"The rate limit is almost exhausted, waiting {delay:.0f} seconds for it to reset.", flush=True)
+                self._pause(delay)
+
+    async def request(self, document, *, idempotent=True, **variables):
+        attempt = 0
+
+        while True:
+            await self._acquire()
+
+            throttled = False
+            self._report.graphql_request_n += 1
+
+            try:
+                data = await self._client.request(document, **variables)
+            except graphql.client.ClientResponseError as e:
+                delay, throttled, retriable = self._inspect(e, idempotent=idempotent)
+
+                if not retriable or attempt >= self._retries:
+                    raise
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = None
+
+                if not idempotent or attempt >= self._retries:
+                    raise
+            else:
+                self._observe(data)
+
+                return data
+            finally:
+                await self._release(throttled=throttled)
+
+            attempt += 1
+            self._report.retry_n += 1
+
+            if delay is None:
+                delay = min(2**attempt, 60) * random.uniform(0.5, 1)
+            else:
+                delay += random.uniform(0, 1)
+
+            if throttled:
+                print_warning(f"The request was rate limited, retrying in {delay:.0f} seconds.", flush=True)
+                self._pause(delay)
+            else:
+                print_debug(f"The request failed, retrying in {delay:.0f} seconds.", flush=True)
+
+            await asyncio.sleep(delay)
+
+
+class _RepositoryReader:
+    def __init__(self, client, repositories, *, fields):
+        self._client = client
+        self._repositories = repositories
+        self._indices = {repository: i for (i, repository) in enumerate(repositories)}
+        self._fields = fields
+
+        self._futures = dict()
+
+    async def _fetch(self, chunk):
+        variables = dict()
+        for (i, repository) in enumerate(chunk):
+            variables[f"owner{i}"], variables[f"name{i}"] = repository.split("/")
+
+        try:
+            data = await self._client.request(_repositories_query(len(chunk)), **self._fields, **variables)
+        except graphql.client.ClientResponseGraphQLError as e:
+            print_debug(f"The request to fetch {len(chunk)} repositories failed for some of them.", e)
+            data = (e.data or dict()).get("data", None) or dict()
+        except graphql.client.ClientResponseError as e:
+            print_debug(f"The request to fetch {len(chunk)} repositories failed.", e)
+            data = dict()
+
+        return {repository: data.get(f"r{i}", None) for (i, repository) in enumerate(chunk)}
+
+    async def get(self, repository):
+        if repository not in self._futures.keys():
+            chunk = list()
+
+            for repository_ in self._repositories[self._indices[repository] :]:
+                if repository_ not in self._futures.keys():
+                    chunk.append(repository_)
+
+                    if len(chunk) == _REPOSITORY_BATCH_N:
+                        break
+
+            future = asyncio.ensure_future(self._fetch(chunk))
+
+            for repository_ in chunk:
+                self._futures[repository_] = future
+
+        results = await asyncio.shield(self._futures[repository])
+
+        return results.pop(repository, None)
+
+
+class _State:
+    def __init__(self, path):
+        self._path = path
+
+        try:
+            with open(path, "r") as stream:
+                data = json.load(stream)
+
+            if data["version"] != version:
+                raise ValueError
+
+            self._repositories = dict(data["repositories"])
+        except (KeyError, OSError, TypeError, ValueError):
+            self._repositories = dict()
+
+    def get(self, repository):
+        return self._repositories.get(repository, None)
+
+    def set(self, repository, entry):
+        self._repositories[repository] = entry
+
+    def remove(self, repository):
+        self._repositories.pop(repository, None)
+
+    def save(self):
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(self._path + ".tmp", "w") as stream:
+            json.dump({"version": version, "repositories": self._repositories}, stream)
+
+        os.replace(self._path + ".tmp", self._path)
+
+
+class _Journal:
+    def __init__(self, path):
+        self._path = path
+        self._stream = None
+
+    def load(self):
+        with open(self._path, "r") as stream:
+            header = stream.readline()
+            if not header:
+                raise ValueError("The journal does not contain a plan, as the run which wrote it stopped before every repository was compared.")
+
+            plan = json.loads(header)
+
+            done = set()
+            for line in stream:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+
+                done.add((record["repository"], record["mutation"], record["name"]))
+
+        for (repository, entry) in list(plan["repositories"].items()):
+            for mutation in ("update", "delete", "create"):
+                entry[mutation] = [(name, data) for (name, data) in entry[mutation] if (repository, mutation, name) not in done]
+
+            if not (entry["update"] or entry["delete"] or entry["create"]):
+                del plan["repositories"][repository]
+
+        return plan
+
+    def open(self, *, resume=False):
+        self._stream = open(self._path, "a" if resume else "w")
+
+    def write_plan(self, plan):
+        self._stream.write(json.dumps(plan) + "\n")
+        self._stream.flush()
+
+    def record(self, repository, mutation, name):
+        self._stream.write(json.dumps({"repository": repository, "mutation": mutation, "name": name}) + "\n")
+        self._stream.flush()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+def _get_digest(content):
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
+    return hashlib.sha256(content).hexdigest()
+
+
+class _SourceCache:
+    def __init__(self, path, *, offline, report):
+        self._path = path
+        self._offline = offline
+        self._report = report
+
+    def _get_path(self, url):
+        return os.path.join(self._path, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _get_catalog_path(self, content, partial):
+        return os.path.join(self._path, "catalog-" + _get_digest(f"{version}\0{partial}\0{_get_digest(content)}") + ".json")
+
+    def _load(self, path):
+        try:
+            with open(path, "r") as stream:
+                return json.load(stream)
+        except (OSError, ValueError):
+            return None
+
+    def _dump(self, path, entry):
+        os.makedirs(self._path, exist_ok=True)
+
+        with open(path + ".tmp", "w") as stream:
+            json.dump(entry, stream)
+
+        os.replace(path + ".tmp", path)
+
+    def _get(self, url):
+        if self._path is None:
+            return None
+
+        entry = self._load(self._get_path(url))
+
+        if entry is None or entry.get("url", None) != url:
+            return None
+
+        return entry
+
+    def _set(self, url, entry):
+        try:
+            self._dump(self._get_path(url), entry)
+        except (OSError, TypeError, ValueError) as e:
+            print_debug(f"Failed to cache source '{url}'.", e)
+
+    def get_catalog(self, content, *, partial):
+        if self._path is None:
+            return None
+
+        return self._load(self._get_catalog_path(content, partial))
+
+    def set_catalog(self, content, catalog, *, partial):
+        if self._path is None:
+            return
+
+        try:
+            self._dump(self._get_catalog_path(content, partial), catalog)
+        except (OSError, TypeError, ValueError) as e:
+            print_debug("Failed to cache the catalog.", e)
+
+    async def read(self, session, url):
+        entry = self._get(url)
+
+        if self._offline:
+            if entry is None:
+                raise OSError(f"The source '{url}' is not cached.")
+
+            return (entry["content"], entry["source"])
+
+        headers = dict()
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            async with session.request("GET", url, headers=headers) as response:
+                if entry is not None and response.status == 304:
+                    print_debug(f"Using cached source '{url}'.")
+                    return (entry["content"], entry["source"])
+
+                response.raise_for_status()
+
+                content = await response.read()
+                etag = response.headers.get("ETag", None)
+                last_modified = response.headers.get("Last-Modified", None)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if entry is None:
+                raise
+
+            print_warning(f"Using cached source '{url}' because it could not be reached.")
+            return (entry["content"], entry["source"])
+
+        started = time.perf_counter()
+        source = _load_yaml(content)
+        self._report.record("parse", started)
+
+        if self._path is not None:
+            try:
+                content = content.decode("utf-8")
+            except UnicodeDecodeError:
+                pass
+            else:
+                entry = {
+                    "url": url,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "content": content,
+                    "source": source,
+                }
+
+                self._set(url, entry)
+
+        return (content, source)
+
+
+def _hsv_to_rgb(h, s, v):
+    h /= 360
+    s /= 100
+    v /= 100
+
+    r, g, b = colorsys.hsv_to_rgb(h, s, v)
+
+    r = int(round(r * 255, 0))
+    g = int(round(g * 255, 0))
+    b = int(round(b * 255, 0))
+
+    return (r, g, b)
+
+
+def _rgb_to_hsv(r, g, b):
+    r /= 255
+    g /= 255
+    b /= 255
+
+    h, s, v = colorsys.rgb_to_hsv(r, g, b)
+
+    h = int(h * 360)
+    s = int(s * 100)
+    v = int(v * 100)
+
+    return (h, s, v)
+
+
+def _parse_color(color):
+    match = _COLOR_REGEX.fullmatch(color)
+    if not match:
+        raise ValueError(f"The color value '{color}' is not valid.")
+
+    return (match.group(1), match.group(2))
+
+
+def _get_color(color, palette, cache):
+    if isinstance(color, int):
+        return color
+
+    try:
+        return cache[color]
+    except KeyError:
+        pass
+
+    base_string, offset_string = _parse_color(color)
+
+    base_color = min(max(palette[base_string], 0), 0xFFFFFF)
+
+    for (operator, component, value) in _COLOR_OFFSET_REGEX.findall(offset_string):
+        if operator == "+":
+            operator = int.__add__
+        else:
+            operator = int.__sub__
+
+        component = component.lower()
+
+        if component == "h":
+            value_max = 359
+        elif component in ("s", "v"):
+            value_max = 100
+        else:
+            value_max = 255
+
+        clamp = lambda v: min(max(v, 0), value_max)
+
+        value = int(value)
+
+        components = {
+            "r": base_color >> 16 & 0xFF,
+            "g": base_color >> 8 & 0xFF,
+            "b": base_color & 0xFF,
+        }
+
+        if component in ("h", "s", "v"):
+            h, s, v = _rgb_to_hsv(components["r"], components["g"], components["b"])
+            components.update({"h": h, "s": s, "v": v})
+
+        components[component] = clamp(operator(components[component], value))
+
+        if component in ("h", "s", "v"):
+            r, g, b = _hsv_to_rgb(components["h"], components["s"], components["v"])
+            components.update({"r": r, "g": g, "b": b})
+
+        base_color = components["r"] << 16 | components["g"] << 8 | components["b"]
+
+    cache[color] = base_color
+
+    return base_color
+
+
+def _populate_colors(colors, cache):
+    populated = dict()
+
+    def populate(key, path):
+        try:
+            return populated[key]
+        except KeyError:
+            pass
+
+        value = colors[key]
+
+        if not isinstance(value, int):
+            base_string, _ = _parse_color(value)
+
+            if base_string in path:
+                cycle = " -> ".join((*path[path.index(base_string) :], base_string))
+                raise ValueError(f"The color key '{base_string}' is recursive. ({cycle})")
+
+            if base_string not in colors.keys():
+                raise ValueError(f"The color key '{key}' requests color '{base_string}' which does not exist.")
+
+            populate(base_string, (*path, base_string))
+
+            value = _get_color(value, populated, cache)
+
+        populated[key] = value
+
+        return value
+
+    for key in colors.keys():
+        populate(key, (key,))
+
+    return {key: populated[key] for key in colors.keys()}
+
+
+def _merge_sources(sources):
+    colors = dict()
+    defaults = dict()
+    groups = list()
+    labels = list()
+
+    group_index = dict()
+    group_label_indexes = dict()
+    label_index = dict()
+
+    for source in sources:
+        source_colors = source.get("colors", dict())
+        if isinstance(source_colors, list):
+            source_colors = {c["name"]: c["value"] for c in source_colors}
+
+        colors.update(source_colors)
+
+        source_defaults = source.get("defaults", dict())
+        if isinstance(source_defaults, list):
+            source_defaults = {d["name"]: d["value"] for d in source_defaults}
+
+        defaults.update(source_defaults)
+
+        source_groups = source.get("groups", list())
+        if isinstance(source_groups, dict):
+            source_groups = [{"name": n, **d} for (n, d) in source_groups.items()]
+
+        for group_data in source_groups:
+            group_name = group_data.get("name", None)
+            group_color = group_data.get("color", False)
+            group_description = group_data.get("description", False)
+            group_labels = group_data.get("labels", list())
+            if isinstance(group_labels, dict):
+                group_labels = [{"name": n, **d} for (n, d) in group_labels.items()]
+
+            existing_group = None
+            if group_name:
+                existing_group = group_index.get(group_name, None)
+
+            if existing_group:
+                if group_color is not False:
+                    existing_group["color"] = group_color
+
+                if group_description is not False:
+                    existing_group["description"] = group_description
+
+                if group_labels and "labels" not in existing_group.keys():
+                    existing_group["labels"] = list()
+
+                existing_label_index = group_label_indexes[group_name]
+
+                for label_data in group_labels:
+                    label_name = label_data["name"]
+                    label_color = label_data.get("color", False)
+                    label_description = label_data.get("description", False)
+                    label_aliases = label_data.get("aliases", False)
+
+                    existing_label = existing_label_index.get(label_name, None)
+
+                    if existing_label:
+                        if label_color is not False:
+                            existing_label["color"] = label_color
+
+                        if label_description is not False:
+                            existing_label["description"] = label_description
+
+                        if label_aliases is not False:
+                            existing_label["aliases"] = label_aliases
+                    else:
+                        data = {
+                            "name": label_name,
+                            "color": label_color,
+                            "description": label_description,
+                            "aliases": label_aliases,
+                        }
+
+                        existing_group["labels"].append(data)
+                        existing_label_index[label_name] = data
+            else:
+                for label_data in group_labels:
+                    label_data.setdefault("color", None)
+                    label_data.setdefault("description", None)
+                    label_data.setdefault("aliases", None)
+
+                data = {
+                    "name": group_name,
+                    "color": group_color,
+                    "description": group_description,
+                    "labels": group_labels,
+                }
+
+                groups.append(data)
+
+                if group_name:
+                    group_index[group_name] = data
+                    group_label_indexes[group_name] = existing_label_index = dict()
+
+                    for label_data in group_labels:
+                        existing_label_index.setdefault(label_data["name"], label_data)
+
+        source_labels = source.get("labels", list())
+        if isinstance(source_labels, dict):
+            source_labels = [{"name": n, **d} for (n, d) in source_labels.items()]
+
+        for label_data in source_labels:
+            label_name = label_data["name"]
+            label_color = label_data.get("color", False)
+            label_description = label_data.get("description", False)
+            label_aliases = label_data.get("aliases", False)
+
+            existing_label = label_index.get(label_name, None)
+
+            if existing_label:
+                if label_color is not False:
+                    existing_label["color"] = label_color
+
+                if label_description is not False:
+                    existing_label["description"] = label_description
+
+                if label_aliases is not False:
+                    existing_label["aliases"] = label_aliases
+            else:
+                data = {
+                    "name": label_name,
+                    "color": label_color,
+                    "description": label_description,
+                    "aliases": label_aliases,
+                }
+
+                labels.append(data)
+                label_index[label_name] = data
+
+    return (colors, defaults, groups, labels)
+
+
+def _get_group_prefixes(groups):
+    names = sorted(g["name"] for g in groups if g["name"] and g["labels"])
+
+    def get_common_length(a, b):
+        return len(os.path.commonprefix([a, b]))
+
+    prefixes = dict()
+
+    for group in groups:
+        name = group["name"]
+        if not name:
+            continue
+
+        i = bisect.bisect_left(names, name)
+        j = bisect.bisect_right(names, name)
+
+        length = 0
+
+        if i > 0:
+            length = max(length, get_common_length(name, names[i - 1]))
+
+        if j < len(names):
+            length = max(length, get_common_length(name, names[j]))
+
+        prefixes[name] = name[: length + 1]
+
+    return prefixes
+
+
+def _batch_mutation(mutation, count):
+    field, type = _MUTATION_FIELDS[mutation]
+
+    variables = ",".join(f"$input{i}:{type}!" for i in range(count))
+    fields = "".join(f"{field[0]}{i}:{field}(input:$input{i}){{__typename}}" for i in range(count))
+
+    return f"mutation({variables}){{{fields}}}"
+
+
+def _state_query(count):
+    variables = "".join(f",$name{i}:String!" for i in range(count))
+    fields = "".join(f"l{i}:label(name:$name{i}){{color,description,id,name}}" for i in range(count))
+
+    return f"query($name:String!,$owner:String!{variables}){{rateLimit{{cost,remaining,resetAt}}repository(owner:$owner,name:$name){{id,labels{{totalCount}}{fields}}}}}"
+
+
+def _repositories_query(count):
+    variables = "".join(f",$name{i}:String!,$owner{i}:String!" for i in range(count))
+    fields = "".join(
+        f"r{i}:repository(owner:$owner{i},name:$name{i}){{id,labels(first:100){{pageInfo{{endCursor,hasNextPage}}nodes{{color@include(if:$color),description@include(if:$description),id,name}}}}}}"
+        for i in range(count)
+    )
+
+    return f"query($color:Boolean!,$description:Boolean!{variables}){{rateLimit{{cost,remaining,resetAt}}{fields}}}"
+
+
+def _map_batch_errors(e, count):
+    errors = [None] * count
+
+    for error in e.data.get("errors", list()):
+        path = error.get("path", None)
+
+        try:
+            i = int(path[0][1:])
+        except (IndexError, TypeError, ValueError):
+            i = None
+
+        if i is None or not 0 <= i < count:
+            return [e] * count
+
+        if errors[i] is None:
+            errors[i] = _BatchError(error.get("message", "An unknown error occurred."))
+
+    if not any(errors):
+        return [e] * count
+
+    return errors
+
+
+class Label:
+    __slots__ = ("name", "color", "description", "id")
+
+    def __init__(self, name, *, color=None, description=None, id=None):
+        self.name = name
+        self.color = color
+        self.description = description
+        self.id = id
+
+    def __repr__(self):
+        return f"<Label name={self.name!r} color={self.color!r} description={self.description!r}>"
+
+    def __eq__(self, other):
+        if not isinstance(other, Label):
+            return NotImplemented
+
+        return (self.name, self.color, self.description, self.id) == (other.name, other.color, other.description, other.id)
+
+
+class Catalog:
+    __slots__ = ("labels", "aliases")
+
+    def __init__(self, labels, aliases=None):
+        self.labels = labels
+        self.aliases = aliases or dict()
+
+    def __repr__(self):
+        return f"<Catalog labels={len(self.labels)} aliases={len(self.aliases)}>"
+
+    @classmethod
+    def from_dict(cls, data):
+        labels = {name: Label(name, color=d["color"], description=d["description"]) for (name, d) in data["labels"].items()}
+
+        return cls(labels, dict(data["aliases"]))
+
+    def to_dict(self):
+        labels = {name: {"color": label.color, "description": label.description} for (name, label) in self.labels.items()}
+
+        return {"labels": labels, "aliases": self.aliases}
+
+    def get_fingerprint(self, *, partial):
+        return _get_digest(json.dumps([partial, self.to_dict()["labels"]], sort_keys=True))
+
+
+class Diff:
+    __slots__ = ("update", "delete", "create", "skipped", "renamed")
+
+    def __init__(self, update, delete, create, skipped, renamed=None):
+        self.update = update
+        self.delete = delete
+        self.create = create
+        self.skipped = skipped
+        self.renamed = renamed or dict()
+
+    def __repr__(self):
+        return f"<Diff update={len(self.update)} delete={len(self.delete)} create={len(self.create)} skipped={self.skipped}>"
+
+
+class MutationError(Exception):
+    def __init__(self, message, *, mutation, name):
+        super().__init__(message)
+        self.mutation = mutation
+        self.name = name
+
+
+def _diff_label(requested, existing, *, partial):
+    data = dict()
+
+    for key in ("color", "description"):
+        value = getattr(requested, key)
+
+        if partial and value is None:
+            pass
+        elif value != getattr(existing, key):
+            data[key] = value
+
+    return data
+
+
+def _get_renames(catalog, existing_labels, *, partial, detect_renames):
+    renamed_labels = dict()
+
+    for old_name in sorted(existing_labels.keys() & catalog.aliases.keys()):
+        new_name = catalog.aliases[old_name]
+
+        if new_name not in existing_labels.keys() and new_name not in renamed_labels.values():
+            renamed_labels[old_name] = new_name
+
+    if detect_renames and not partial:
+        old_names = collections.defaultdict(list)
+        for name in sorted(existing_labels.keys() - catalog.labels.keys() - renamed_labels.keys()):
+            old_names[(existing_labels[name].color, existing_labels[name].description)].append(name)
+
+        new_names = collections.defaultdict(list)
+        for name in sorted(catalog.labels.keys() - existing_labels.keys() - set(renamed_labels.values())):
+            new_names[(catalog.labels[name].color, catalog.labels[name].description)].append(name)
+
+        for (key, names) in new_names.items():
+            if len(names) == 1 and len(old_names.get(key, list())) == 1:
+                renamed_labels[old_names[key][0]] = names[0]
+
+    return renamed_labels
+
+
+def _get_update_inputs(catalog, labels, *, partial):
+    update = list()
+    skip_n = 0
+
+    for label in sorted(labels, key=lambda label: label.name):
+        if label.name not in catalog.labels.keys():
+            continue
+
+        data = _diff_label(catalog.labels[label.name], label, partial=partial)
+
+        if data:
+            data["id"] = label.id
+            update.append((label.name, data))
+        else:
+            skip_n += 1
+
+    return (update, skip_n)
+
+
+def _get_delete_inputs(catalog, existing_labels, *, partial):
+    labels = list()
+
+    if not partial:
+        for name in sorted(existing_labels.keys() - catalog.labels.keys()):
+            labels.append((name, {"id": existing_labels[name].id}))
+
+    return labels
+
+
+def _get_create_inputs(catalog, existing_labels, repository_id):
+    labels = list()
+
+    for name in sorted(catalog.labels.keys() - existing_labels.keys()):
+        label = catalog.labels[name]
+
+        data = {
+            "color": label.color,
+            "description": label.description,
+            "name": name,
+            "repositoryId": repository_id,
+        }
+
+        labels.append((name, data))
+
+    return labels
+
+
+async def _mutate_labels(client, mutation, labels):
+    if len(labels) == 1:
+        ((_, data),) = labels
+        document = mutation
+        variables = {"input": data}
+    else:
+        document = _batch_mutation(mutation, len(labels))
+        variables = {f"input{i}": data for (i, (_, data)) in enumerate(labels)}
+
+    try:
+        await client.request(document, idempotent=mutation == MUTATE_LABEL_UPDATE, **variables)
+    except graphql.client.ClientResponseGraphQLError as e:
+        return _map_batch_errors(e, len(labels))
+    except (graphql.client.ClientResponseError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return [e] * len(labels)
+
+    return [None] * len(labels)
+
+
+def _get_scheduler(client, *, concurrency, retries):
+    if isinstance(client, _Scheduler):
+        return client
+
+    return _Scheduler(client, concurrency=concurrency, report=_Report(), retries=retries)
+
+
+async def _follow_labels(client, labels, repository_id, *, fields):
+    while True:
+        yield labels["nodes"]
+
+        if not labels["pageInfo"]["hasNextPage"]:
+            break
+
+        cursor = labels["pageInfo"]["endCursor"]
+
+        data = await client.request(QUERY_REPOSITORY_LABELS_PAGE, cursor=cursor, repository_id=repository_id, **fields)
+        labels = data["node"]["labels"]
+
+
+async def _read_origin(session, cache, origin):
+    if origin.startswith("http://") or origin.startswith("https://"):
+        return await cache.read(session, origin)
+
+    with open(origin, "r") as stream:
+        content = stream.read()
+
+    return (content, None)
+
+
+async def _read_sources(session, cache, origin, content, source, loaded, *, partial, report):
+    sources = list()
+    digests = dict()
+    tasks = dict()
+    used = set()
+
+    def read_inherit(source):
+        inherit = source.pop("inherit", list())
+        if isinstance(inherit, str):
+            inherit = [inherit]
+
+        return inherit
+
+    def fetch(url):
+        async def load():
+            try:
+                content, source = loaded.pop(url)
+            except KeyError:
+                content, source = await cache.read(session, url)
+
+            digests[url] = _get_digest(content)
+
+            inherit = read_inherit(source)
+
+            for url_ in inherit:
+                fetch(url_)
+
+            return (content, source, inherit)
+
+        if url not in tasks.keys():
+            tasks[url] = asyncio.ensure_future(load())
+
+        return tasks[url]
+
+    async def follow(source, inherit, path):
+        for url in inherit:
+            if url in path:
+                cycle = " -> ".join((*path[path.index(url) :], url))
+                raise ValueError(f"The source '{url}' inherits itself. ({cycle})")
+
+            print_info(f"Reading {'partial ' if partial else ''}source '{url}'.")
+
+            content, source_, inherit_ = await fetch(url)
+
+            if url in used:
+                started = time.perf_counter()
+                source_ = _load_yaml(content)
+                report.record("parse", started)
+
+                read_inherit(source_)
+
+            used.add(url)
+
+            await follow(source_, inherit_, (*path, url))
+
+        sources.append(source)
+
+    if source is None:
+        started = time.perf_counter()
+        source = _load_yaml(content)
+        report.record("parse", started)
+
+    inherit = read_inherit(source)
+
+    for url_ in inherit:
+        fetch(url_)
+
+    try:
+        await follow(source, inherit, (origin,))
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    return (sources, digests)
+
+
+async def load_sources(session, origin, *, cache=None, offline=False, partial=False):
+    report = _Report()
+    cache = _SourceCache(cache, offline=offline, report=report)
+
+    content, source = await _read_origin(session, cache, origin)
+    sources, _ = await _read_sources(session, cache, origin, content, source, dict(), partial=partial, report=report)
+
+    return sources
+
+
+def resolve_catalog(sources, *, partial=False, report=None):
+    started = time.perf_counter()
+
+    colors, defaults, groups, labels = _merge_sources(sources)
+
+    if report is not None:
+        report.record("merge", started)
+
+    print_info("Populating colors.")
+
+    started = time.perf_counter()
+
+    color_cache = dict()
+
+    colors = _populate_colors(colors, color_cache)
+
+    default_color = defaults.get("color", None)
+    if default_color:
+        try:
+            default_color = _get_color(default_color, colors, color_cache)
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"The default color requests color '{default_color}' which is not valid.") from e
+
+    default_description = defaults.get("description", None)
+
+    if report is not None:
+        report.record("colors", started)
+
+    print_info("Populating requested labels.")
+
+    started = time.perf_counter()
+
+    requested_labels = dict()
+    label_aliases = dict()
+
+    def add_label(label_name, label_color, label_description, in_group):
+        if label_color is None:
+            if not partial:
+                raise ValueError(f"The label '{label_name}'{in_group} does not have a color and no default was provided.")
+        elif isinstance(label_color, str):
+            try:
+                label_color = _get_color(label_color, colors, color_cache)
+            except (KeyError, ValueError) as e:
+                raise ValueError(f"The label '{label_name}'{in_group} requests color '{label_color}' which is not valid.") from e
+
+        return Label(label_name, color=f"{label_color:>06X}" if label_color else None, description=label_description)
+
+    for label_data in labels:
+        label_name = label_data["name"]
+
+        label = add_label(label_name, label_data["color"] or default_color, label_data["description"] or default_description, "")
+
+        requested_labels[label_name] = label
+        label_aliases[label_name] = label_data["aliases"]
+
+    group_prefixes = _get_group_prefixes(groups)
+
+    for group_data in groups:
+        group_name = group_data["name"]
+        group_color = group_data["color"]
+        group_description = group_data["description"]
+        group_labels = group_data["labels"]
+
+        group_prefix = group_prefixes.get(group_name, None)
+
+        for label_data in group_labels:
+            label_name = label_data["name"]
+
+            label_color = label_data["color"] or group_color or default_color
+            label_description = label_data["description"] or group_description or default_description
+
+            label = add_label(label_name, label_color, label_description, f" in group '{group_name}'")
+
+            if group_prefix:
+                label_name = f"{group_prefix}:{label_name}"
+                label.name = label_name
+
+            if label_name in requested_labels.keys():
+                raise ValueError(f"The group '{group_name}' defines label '{label_name}' which already exists.")
+
+            requested_labels[label_name] = label
+            label_aliases[label_name] = label_data["aliases"]
+
+    requested_aliases = dict()
+
+    for (label_name, aliases) in label_aliases.items():
+        if isinstance(aliases, str):
+            aliases = [aliases]
+
+        for alias in aliases or list():
+            if alias in requested_labels.keys():
+                raise ValueError(f"The label '{label_name}' has alias '{alias}' which is also a label.")
+
+            if alias in requested_aliases.keys():
+                raise ValueError(f"The label '{label_name}' has alias '{alias}' which is also an alias of label '{requested_aliases[alias]}'.")
+
+            requested_aliases[alias] = label_name
+
+    if report is not None:
+        report.record("labels", started)
+
+    return Catalog(requested_labels, requested_aliases)
+
+
+def diff_labels(catalog, existing_labels, repository_id, *, partial=False, detect_renames=False, updates=True):
+    existing_labels = dict(existing_labels)
+
+    if updates:
+        update, skip_n = _get_update_inputs(catalog, existing_labels.values(), partial=partial)
+    else:
+        update, skip_n = (list(), 0)
+
+    renamed = _get_renames(catalog, existing_labels, partial=partial, detect_renames=detect_renames)
+
+    for (old_name, new_name) in renamed.items():
+        existing_label = existing_labels.pop(old_name)
+        existing_labels[new_name] = existing_label
+
+        data = {"id": existing_label.id, "name": new_name, **_diff_label(catalog.labels[new_name], existing_label, partial=partial)}
+        update.append((new_name, data))
+
+    delete = _get_delete_inputs(catalog, existing_labels, partial=partial)
+    create = _get_create_inputs(catalog, existing_labels, repository_id)
+
+    return Diff(update, delete, create, skip_n, renamed)
+
+
+async def fetch_labels(client, owner, name, *, retries=3):
+    client = _get_scheduler(client, concurrency=1, retries=retries)
+
+    fields = {"color": True, "description": True}
+
+    data = await client.request(QUERY_REPOSITORY, owner=owner, name=name, **fields)
+
+    try:
+        repository_id = data["repository"]["id"]
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"The repository '{owner}/{name}' does not exist or cannot be seen.") from e
+
+    existing_labels = dict()
+
+    async for nodes in _follow_labels(client, data["repository"]["labels"], repository_id, fields=fields):
+        for node in nodes:
+            existing_labels[node["name"]] = Label(node["name"], color=node["color"], description=node["description"], id=node["id"])
+
+    return (repository_id, existing_labels)
+
+
+async def apply_diff(client, diff, *, batch_size=1, concurrency=1, retries=3):
+    client = _get_scheduler(client, concurrency=concurrency, retries=retries)
+
+    counts = dict()
+
+    mutations = (
+        (MUTATE_LABEL_UPDATE, "update", diff.update),
+        (MUTATE_LABEL_DELETE, "delete", diff.delete),
+        (MUTATE_LABEL_CREATE, "create", diff.create),
+    )
+
+    for (mutation, verb, labels) in mutations:
+        async with _Dispatcher(concurrency=concurrency) as dispatcher:
+            futures = list()
+            for i in range(0, len(labels), batch_size):
+                chunk = labels[i : i + batch_size]
+                futures.append((chunk, dispatcher.submit(_mutate_labels, client, mutation, chunk)))
+
+            for (chunk, future) in futures:
+                for ((name, _), e) in zip(chunk, await future):
+                    if e is not None:
+                        raise MutationError(f"The request to {verb} label '{name}' failed.", mutation=verb, name=name) from e
+
+        counts[mutation] = len(labels)
+
+    return (counts[MUTATE_LABEL_CREATE], counts[MUTATE_LABEL_UPDATE], counts[MUTATE_LABEL_DELETE], diff.skipped)
+
+
+class _Reconciler:
+    def __init__(self, client, catalog, *, batch_size, concurrency, debounce, detect_renames, partial, report):
+        self._client = client
+        self._catalog = catalog
+        self._batch_size = batch_size
+        self._concurrency = concurrency
+        self._debounce = debounce
+        self._detect_renames = detect_renames
+        self._partial = partial
+        self._report = report
+
+        self._pending = dict()
+        self._workers = dict()
+
+    def submit(self, repository, name, *, old_name=None):
+        names, aliases = self._pending.setdefault(repository, (set(), dict()))
+
+        names.add(name)
+
+        if old_name is not None:
+            names.add(old_name)
+
+            target = aliases.pop(old_name, None) or (old_name if old_name in self._catalog.labels.keys() else None)
+            if target is not None and name not in self._catalog.labels.keys():
+                aliases[name] = target
+
+        for name_ in (name, old_name):
+            if name_ in self._catalog.aliases.keys():
+                names.add(self._catalog.aliases[name_])
+
+        if repository not in self._workers.keys():
+            self._workers[repository] = asyncio.ensure_future(self._work(repository))
+
+    async def _work(self, repository):
+        try:
+            while repository in self._pending.keys():
+                await asyncio.sleep(self._debounce)
+
+                names, aliases = self._pending.pop(repository)
+
+                try:
+                    await self._reconcile(repository, sorted(names), aliases)
+                except Exception as e:
+                    print_error(f"Failed to reconcile labels in '{repository}'.", e)
+        finally:
+            del self._workers[repository]
+
+    async def _reconcile(self, repository, names, aliases):
+        owner, name = repository.split("/")
+
+        started = time.perf_counter()
+
+        variables = {f"name{i}": name_ for (i, name_) in enumerate(names)}
+
+        try:
+            data = await self._client.request(_state_query(len(names)), owner=owner, name=name, **variables)
+            repository_id = data["repository"]["id"]
+        except graphql.client.ClientResponseError as e:
+            print_error(f"The request to fetch labels in '{repository}' failed.", e)
+            return
+        except (KeyError, TypeError) as e:
+            print_error(f"The repository '{repository}' does not exist or the token you provided cannot see it.", e)
+            return
+
+        existing_labels = dict()
+
+        for i in range(len(names)):
+            node = data["repository"][f"l{i}"]
+
+            if node is not None:
+                existing_labels[node["name"]] = Label(node["name"], color=node["color"], description=node["description"], id=node["id"])
+
+        requested_labels = {name_: self._catalog.labels[name_] for name_ in names if name_ in self._catalog.labels.keys()}
+        requested_aliases = {
+            alias: target
+            for (alias, target) in self._catalog.aliases.items()
+            if alias in existing_labels.keys() and target in requested_labels.keys()
+        }
+        requested_aliases.update(aliases)
+
+        catalog = Catalog(requested_labels, requested_aliases)
+
+        diff = diff_labels(catalog, existing_labels, repository_id, partial=self._partial, detect_renames=self._detect_renames)
+
+        if not (diff.update or diff.delete or diff.create):
+            print_debug(f"Skipped {len(names)} labels in '{repository}', which are already synchronized.")
+            return
+
+        try:
+            counts = await apply_diff(self._client, diff, batch_size=self._batch_size, concurrency=self._concurrency)
+        except MutationError as e:
+            print_error(f"The request to reconcile labels in '{repository}' failed.", e)
+            self._report.get_repository(repository)["failed"] = True
+            return
+
+        self._report.record("reconcile", started, repository=repository)
+
+        data = self._report.get_repository(repository)
+        for (key, n) in zip(self._report.counts, counts):
+            data[key] += n
+
+        create_n, update_n, delete_n, _ = counts
+        print_info(f"Reconciled labels in '{repository}', {create_n} created, {update_n} updated, and {delete_n} deleted.")
+
+    async def close(self):
+        self._pending.clear()
+
+        workers = list(self._workers.values())
+
+        for worker in workers:
+            worker.cancel()
+
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+def _create_webhook_application(reconciler, *, repositories, secret):
+    from aiohttp import web
+
+    async def handle(request):
+        body = await request.read()
+
+        if secret is not None:
+            signature = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+            if not hmac.compare_digest(signature, request.headers.get("X-Hub-Signature-256", "")):
+                print_warning("Rejected a webhook with an invalid signature.")
+                return web.Response(status=401)
+
+        event = request.headers.get("X-GitHub-Event", None)
+
+        if event != "label":
+            print_debug(f"Ignored a '{event}' webhook.")
+            return web.Response(status=204)
+
+        try:
+            payload = json.loads(body)
+
+            action = payload["action"]
+            repository = payload["repository"]["full_name"]
+            name = payload["label"]["name"]
+            old_name = ((payload.get("changes", None) or dict()).get("name", None) or dict()).get("from", None)
+
+            owner, _ = repository.split("/")
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            print_warning("Rejected a webhook which is not valid.", e)
+            return web.Response(status=400)
+
+        if repositories and repository not in repositories and f"{owner}/*" not in repositories:
+            print_debug(f"Ignored a webhook for '{repository}'.")
+            return web.Response(status=204)
+
+        print_debug(f"Received a webhook for label '{name}' {action} in '{repository}'.")
+
+        reconciler.submit(repository, name, old_name=old_name)
+
+        return web.Response(status=202)
+
+    application = web.Application()
+    application.router.add_post("/", handle)
+
+    return application
+
+
+async def _serve(reconciler, address, *, repositories, secret):
+    from aiohttp import web
+
+    runner = web.AppRunner(_create_webhook_application(reconciler, repositories=repositories, secret=secret), access_log=None)
+    await runner.setup()
+
+    host, _, port = address.rpartition(":")
+
+    stopped = asyncio.Event()
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(signum, stopped.set)
+        except NotImplementedError:
+            pass
+
+    try:
+        await web.TCPSite(runner, host or None, int(port)).start()
+
+        print_info(f"Listening for label webhooks on '{address}'.")
+
+        await stopped.wait()
+
+        print_info("Stopped listening for label webhooks.")
+    finally:
+        await runner.cleanup()
+        await reconciler.close()
+
+    return 0
+
+
+async def main(
+    *,
+    apply_path,
+    audit,
+    batch_size,
+    cache,
+    concurrency,
+    debounce,
+    detect_renames,
+    endpoint,
+    journal,
+    offline,
+    partial,
+    plan,
+    report,
+    repositories,
+    repository_concurrency,
+    resume,
+    retries,
+    serve,
+    session,
+    source,
+    state,
+    state_interval,
+    token,
+    webhook_secret,
+):
+    print_info(f"Running ShineyDev/sync-labels-action v{version}.")
+
+    async def read_catalog(session, content):
+        catalog = cache.get_catalog(content, partial=partial)
+        if catalog is None:
+            return (None, dict())
+
+        loaded = dict()
+
+        try:
+            urls = list(catalog["sources"].keys())
+
+            for (url, result) in zip(urls, await asyncio.gather(*(cache.read(session, url) for url in urls))):
+                loaded[url] = result
+
+            for (url, (content_, _)) in loaded.items():
+                if _get_digest(content_) != catalog["sources"][url]:
+                    print_debug(f"The source '{url}' has changed since the catalog was cached.")
+                    return (None, loaded)
+
+            return (Catalog.from_dict(catalog), loaded)
+        except (AttributeError, KeyError, TypeError, OSError, aiohttp.ClientError, asyncio.TimeoutError, yaml.YAMLError) as e:
+            print_debug("Failed to read the cached catalog.", e)
+            return (None, loaded)
 
+    cache = _SourceCache(cache, offline=offline, report=report)
 
-_printers = list()
-_last_id = None
-_last_suffix = None
+    async def read_labels():
+        print_info("Reading sources.")
+        print_info(f"Reading {'partial ' if partial else ''}source '{source}'.")
 
+        try:
+            started = time.perf_counter()
 
-def _create_printer(*, id=None, level=None, prefix=None, suffix=None, stream=sys.stdout):
-    prefix = str(prefix) if prefix else ""
-    suffix = str(suffix) if suffix else ""
+            content, source_ = await _read_origin(session, cache, source)
 
-    def printer(*args, end="\n", file=stream, sep=" ", **kwargs):
-        prefix_ = prefix
-        suffix_ = suffix
+            catalog, loaded = await read_catalog(session, content)
 
-        if not printer.is_active:
-            return
+            if catalog is None:
+                sources, digests = await _read_sources(session, cache, source, content, source_, loaded, partial=partial, report=report)
 
-        args = list(args)
+            report.record("read", started)
+        except (OSError, ValueError, aiohttp.ClientResponseError, yaml.YAMLError) as e:
+            print_fatal("The source you provided is not valid.", e)
+            return None
 
-        e = None
-        if args and isinstance(args[-1], BaseException):
-            *args, e = args
+        if catalog is None:
+            try:
+                catalog = resolve_catalog(sources, partial=partial, report=report)
+            except ValueError as e:
+                print_fatal(str(e), e.__cause__)
+                return None
 
-        args = [a if isinstance(a, str) else repr(a) for a in args]
+            cache.set_catalog(content, {"sources": digests, **catalog.to_dict()}, partial=partial)
+        else:
+            print_info("Using cached labels.")
 
-        global _last_id
-        global _last_suffix
+        return catalog
 
-        previous = ""
-        if id and _last_id == id:
-            prefix_ = None
-        elif _last_id:
-            previous = _last_suffix + "\n"
+    def fail_uncompared(uncompared):
+        names = ", ".join(f"'{repository}'" for repository in uncompared)
+        print_fatal(f"The repositories {names} could not be compared when the journal was written. Synchronize them without --resume.")
+        return 1
 
-        _last_id = None
+    if apply_path is None and not resume:
+        applied = None
+        uncompared = list()
 
-        if not end.endswith("\n"):
-            _last_id = id
-            _last_suffix = suffix_
-            suffix_ = None
+        catalog = await read_labels()
+        if catalog is None:
+            return 1
 
-        if prefix_:
-            if args:
-                args[0] = prefix_ + args[0]
-            else:
-                args = [prefix_]
+        fingerprint = catalog.get_fingerprint(partial=partial)
+    else:
+        try:
+            if resume:
+                print_info("Reading journal.")
 
-        if suffix_:
-            if args:
-                args[-1] += suffix_
+                applied = journal.load()
             else:
-                args = [suffix_]
+                print_info(f"Reading plan '{apply_path}'.")
 
-        string = sep.join(args)
+                with open(apply_path, "r") as stream:
+                    applied = json.load(stream)
 
-        if e is not None:
-            if string:
-                if not string.endswith("\n"):
-                    string += " "
+            if applied["version"] != version:
+                raise ValueError(f"The plan was made by version {applied['version']}.")
 
-                string += "See the error output below.\n\n"
+            partial = applied["partial"]
+            fingerprint = applied["catalog"]
+            repositories = list(applied["repositories"].keys())
+            uncompared = list(applied.get("failed", list())) if resume else list()
+        except (KeyError, OSError, TypeError, ValueError) as e:
+            print_fatal("The plan you provided is not valid.", e)
+            return 1
 
-            string += "".join(traceback.format_exception(type(e), e, e.__traceback__))
+        if not repositories:
+            if uncompared:
+                return fail_uncompared(uncompared)
 
-        if "\n" in string:
-            indent = " " * len(re.sub("\x1B\\[[0-9;]+m", "", prefix_)) if prefix_ else ""
-            string = textwrap.indent(string, indent)[len(indent) :]
+            print_info("The plan does not change any repositories.")
+            return 0
 
-        string = previous + string
+        catalog = Catalog(dict())
 
-        print(string, end=end, file=file, **kwargs)
+    if plan is not None:
+        plan["partial"] = partial
+        plan["catalog"] = fingerprint
 
-    printer.is_active = True
-    if level is not None:
-        printer.level = level
-        printer.is_active = False
+    requested_labels = catalog.labels
 
-        _printers.append(printer)
+    print_info("Authenticating to GitHub.")
 
-    return printer
+    headers = {
+        "Accept": "application/vnd.github.bane-preview+json",
+        "Authorization": f"bearer {token}",
+        "User-Agent": f"ShineyDev/sync-labels-action @ {repositories[0]}" if repositories else "ShineyDev/sync-labels-action",
+    }
 
+    client = graphql.client.Client(session=session, url=endpoint, headers=headers)
+    client = _Scheduler(client, concurrency=concurrency * repository_concurrency, report=report, retries=retries)
+
+    if serve is not None:
+        reconciler = _Reconciler(
+            client,
+            catalog,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            debounce=debounce,
+            detect_renames=detect_renames,
+            partial=partial,
+            report=report,
+        )
+
+        return await _serve(reconciler, serve, repositories=repositories, secret=webhook_secret)
+
+    if len(repositories) > 1 or repositories[0].endswith("/*"):
+        resolved_repositories = list()
+
+        for repository in repositories:
+            if not repository.endswith("/*"):
+                resolved_repositories.append(repository)
+                continue
 
-print_debug = _create_printer(id="DEBUG", level=4, prefix="  \x1B[32m[DEBUG]\x1B[39m ")
-print_info = _create_printer(id="INFO", level=3, prefix="   \x1B[34m[INFO]\x1B[39m ")
-print_warning = _create_printer(id="WARNING", level=2, prefix="\x1B[33m[WARNING]\x1B[39m ")
-print_error = _create_printer(id="ERROR", level=1, prefix="  \x1B[31m[ERROR]\x1B[39m", stream=sys.stderr)
-print_fatal = _create_printer(id="FATAL", level=1, prefix="  \x1B[31m[FATAL] ", stream=sys.stderr, suffix="\x1B[39m")
+            owner = repository[:-2]
 
+            print_info(f"Populating repositories for '{owner}'.")
 
-# fmt: off
-MUTATE_LABEL_CREATE = "mutation($input:CreateLabelInput!){createLabel(input:$input){__typename}}"
-MUTATE_LABEL_DELETE = "mutation($input:DeleteLabelInput!){deleteLabel(input:$input){__typename}}"
-MUTATE_LABEL_UPDATE = "mutation($input:UpdateLabelInput!){updateLabel(input:$input){__typename}}"
-QUERY_REPOSITORY_ID = "query($owner:String!,$name:String!){repository(owner:$owner,name:$name){id}}"
-QUERY_REPOSITORY_LABELS_PAGE = "query($cursor:String,$repository_id:ID!){node(id:$repository_id){...on Repository{labels(after:$cursor,first:30){pageInfo{endCursor,hasNextPage}nodes{color,description,id,name}}}}}"
-# fmt: on
+            cursor = None
+            has_next_page = True
 
+            while has_next_page:
+                try:
+                    data = await client.request(QUERY_REPOSITORY_OWNER_REPOSITORIES_PAGE, cursor=cursor, login=owner)
+                except graphql.client.ClientResponseError as e:
+                    print_fatal(f"The request to fetch the repositories for '{owner}' failed.", e)
+                    return 1
 
-async def main(*, partial, repository, source, token):
-    print_info(f"Running ShineyDev/sync-labels-action v{version}.")
+                try:
+                    data = data["repositoryOwner"]["repositories"]
+                except (KeyError, TypeError) as e:
+                    print_fatal(f"The owner '{owner}' does not exist or the token you provided cannot see it.", e)
+                    return 1
 
-    async def follow_sources(content, session):
-        source = yaml.load(content, Loader)
+                for node in data["nodes"]:
+                    if not node["isArchived"]:
+                        resolved_repositories.append(node["nameWithOwner"])
 
-        inherit = source.pop("inherit", list())
-        if isinstance(inherit, str):
-            inherit = [inherit]
+                cursor = data["pageInfo"]["endCursor"]
+                has_next_page = data["pageInfo"]["hasNextPage"]
 
-        for source_ in inherit:
-            print_info(f"Reading {'partial ' if partial else ''}source '{source_}'.")
+        repositories = list(dict.fromkeys(resolved_repositories))
+        fan_out = True
+    else:
+        fan_out = False
 
-            async with session.request("GET", source_, raise_for_status=True) as response:
-                content = await response.read()
+    fields = {
+        "color": not partial or any(label.color is not None for label in requested_labels.values()),
+        "description": not partial or any(label.description is not None for label in requested_labels.values()),
+    }
 
-            async for source_ in follow_sources(content, session):
-                yield source_
+    if fan_out and state is None and applied is None:
+        reader = _RepositoryReader(client, repositories, fields=fields)
+    else:
+        reader = None
 
-        yield source
+    async def verify_repository(repository, entry):
+        try:
+            if entry["catalog"] != fingerprint or time.time() - entry["synchronized_at"] >= state_interval:
+                return False
+        except (KeyError, TypeError):
+            return False
 
-    print_info("Reading sources.")
-    print_info(f"Reading {'partial ' if partial else ''}source '{source}'.")
+        owner, name = repository.split("/")
 
-    colors = dict()
-    defaults = dict()
-    groups = list()
-    labels = list()
+        names = random.sample(sorted(requested_labels.keys()), min(len(requested_labels), _STATE_SAMPLE_N))
+        variables = {f"name{i}": name_ for (i, name_) in enumerate(names)}
 
-    try:
-        async with aiohttp.ClientSession() as session:
-            if source.startswith("http://") or source.startswith("https://"):
-                async with session.request("GET", source, raise_for_status=True) as response:
-                    content = await response.read()
-            else:
-                with open(source, "r") as stream:
-                    content = stream.read()
-
-            async for source in follow_sources(content, session):
-                source_colors = source.get("colors", dict())
-                if isinstance(source_colors, list):
-                    source_colors = {c["name"]: c["value"] for c in source_colors}
-
-                colors.update(source_colors)
-
-                source_defaults = source.get("defaults", dict())
-                if isinstance(source_defaults, list):
-                    source_defaults = {d["name"]: d["value"] for d in source_defaults}
-
-                defaults.update(source_defaults)
-
-                source_groups = source.get("groups", list())
-                if isinstance(source_groups, dict):
-                    source_groups = [{"name": n, **d} for (n, d) in source_groups.items()]
-
-                for group_data in source_groups:
-                    group_name = group_data.get("name", None)
-                    group_color = group_data.get("color", False)
-                    group_description = group_data.get("description", False)
-                    group_labels = group_data.get("labels", list())
-                    if isinstance(group_labels, dict):
-                        group_labels = [{"name": n, **d} for (n, d) in group_labels.items()]
-
-                    existing_group = None
-                    if group_name:
-                        for group in groups:
-                            if group["name"] == group_name:
-                                existing_group = group
-                                break
-
-                    if existing_group:
-                        if group_color is not False:
-                            existing_group["color"] = group_color
-
-                        if group_description is not False:
-                            existing_group["description"] = group_description
-
-                        if group_labels and "labels" not in existing_group.keys():
-                            existing_group["labels"] = list()
-
-                        for label_data in group_labels:
-                            label_name = label_data["name"]
-                            label_color = label_data.get("color", False)
-                            label_description = label_data.get("description", False)
-
-                            existing_label = None
-                            for label in existing_group["labels"]:
-                                if label["name"] == label_name:
-                                    existing_label = label
-                                    break
-
-                            if existing_label:
-                                if label_color is not False:
-                                    existing_label["color"] = label_color
-
-                                if label_description is not False:
-                                    existing_label["description"] = label_description
-                            else:
-                                data = {
-                                    "name": label_name,
-                                    "color": label_color,
-                                    "description": label_description,
-                                }
-
-                                existing_group["labels"].append(data)
-                    else:
-                        for label_data in group_labels:
-                            label_data.setdefault("color", None)
-                            label_data.setdefault("description", None)
+        try:
+            data = await client.request(_state_query(len(names)), owner=owner, name=name, **variables)
+            data = data["repository"]
 
-                        data = {
-                            "name": group_name,
-                            "color": group_color,
-                            "description": group_description,
-                            "labels": group_labels,
-                        }
+            if data["labels"]["totalCount"] != entry["count"]:
+                return False
 
-                        groups.append(data)
+            for (i, name_) in enumerate(names):
+                existing_data = data[f"l{i}"]
 
-                source_labels = source.get("labels", list())
-                if isinstance(source_labels, dict):
-                    source_labels = [{"name": n, **d} for (n, d) in source_labels.items()]
+                if existing_data is None:
+                    return False
 
-                for label_data in source_labels:
-                    label_name = label_data["name"]
-                    label_color = label_data.get("color", False)
-                    label_description = label_data.get("description", False)
+                existing_label = Label(name_, color=existing_data["color"], description=existing_data["description"])
 
-                    existing_label = None
-                    for label in labels:
-                        if label["name"] == label_name:
-                            existing_label = label
-                            break
+                if _diff_label(requested_labels[name_], existing_label, partial=partial):
+                    return False
+        except (graphql.client.ClientResponseError, KeyError, TypeError) as e:
+            print_debug(f"The request to verify the state of '{repository}' failed.", e)
+            return False
 
-                    if existing_label:
-                        if label_color is not False:
-                            existing_label["color"] = label_color
+        return True
 
-                        if label_description is not False:
-                            existing_label["description"] = label_description
-                    else:
-                        data = {
-                            "name": label_name,
-                            "color": label_color,
-                            "description": label_description,
-                        }
+    def submit_mutations(dispatcher, mutation, labels):
+        futures = list()
+        for i in range(0, len(labels), batch_size):
+            chunk = labels[i : i + batch_size]
+            futures.append((chunk, dispatcher.submit(_mutate_labels, client, mutation, chunk)))
 
-                        labels.append(data)
-    except (OSError, aiohttp.ClientResponseError, yaml.YAMLError) as e:
-        print_fatal("The source you provided is not valid.", e)
-        return 1
+        return futures
 
-    def hsv_to_rgb(h, s, v):
-        h /= 360
-        s /= 100
-        v /= 100
+    async def report_mutations(futures, verb, progress, repository, in_repository):
+        n = 0
 
-        r, g, b = colorsys.hsv_to_rgb(h, s, v)
+        for (chunk, future) in futures:
+            errors = await future
 
-        r = int(round(r * 255, 0))
-        g = int(round(g * 255, 0))
-        b = int(round(b * 255, 0))
+            for ((name, _), e) in zip(chunk, errors):
+                if e is not None:
+                    print_info(f"{progress} label '{name}'{in_repository}...", end="")
+                    print_fatal(f"The request to {verb} label '{name}'{in_repository} failed.", e)
+                    return None
 
-        return (r, g, b)
+                n += 1
+                print_info(f"{progress} label '{name}'{in_repository}...done")
 
-    def rgb_to_hsv(r, g, b):
-        r /= 255
-        g /= 255
-        b /= 255
+                if journal is not None:
+                    journal.record(repository, verb, name)
 
-        h, s, v = colorsys.rgb_to_hsv(r, g, b)
+        return n
 
-        h = int(h * 360)
-        s = int(s * 100)
-        v = int(v * 100)
+    async def run_mutations(mutation, labels, verb, progress, repository, in_repository):
+        async with _Dispatcher(concurrency=concurrency) as dispatcher:
+            futures = submit_mutations(dispatcher, mutation, labels)
 
-        return (h, s, v)
+            return await report_mutations(futures, verb, progress, repository, in_repository)
 
-    def get_color(color, palette):
-        if isinstance(color, int):
-            return color
+    async def finish_repository(repository, in_repository, count, update_n, delete_labels, create_labels, skip_n):
+        if update_n:
+            print_info(f"Updated {update_n} labels{in_repository}.")
 
-        match = re.fullmatch("([a-z]+)((?:[+-][rgbhsv][0-9]+)*)", color, re.IGNORECASE)
-        if not match:
-            raise ValueError(f"The color value '{color}' is not valid.")
+        delete_n = 0
 
-        base_string = match.group(1)
-        offset_string = match.group(2)
+        if partial:
+            print_info(f"Skipped delete flow{in_repository}.")
+        else:
+            started = time.perf_counter()
 
-        base_color = min(max(palette[base_string], 0), 0xFFFFFF)
+            delete_n = await run_mutations(MUTATE_LABEL_DELETE, delete_labels, "delete", "Deleting", repository, in_repository)
+            if delete_n is None:
+                return None
 
-        if not offset_string:
-            return base_color
+            report.record("delete", started, repository=repository)
 
-        offsets = re.findall("([+-])([rgbhsv])([0-9]+)", offset_string, re.IGNORECASE)
-        for (operator, component, value) in offsets:
-            if operator == "+":
-                operator = int.__add__
-            else:
-                operator = int.__sub__
+            if delete_n:
+                print_info(f"Deleted {delete_n} labels{in_repository}.")
 
-            component = component.lower()
+        started = time.perf_counter()
 
-            if component == "h":
-                value_max = 359
-            elif component in ("s", "v"):
-                value_max = 100
-            else:
-                value_max = 255
+        create_n = await run_mutations(MUTATE_LABEL_CREATE, create_labels, "create", "Creating", repository, in_repository)
+        if create_n is None:
+            return None
 
-            clamp = lambda v: min(max(v, 0), value_max)
+        report.record("create", started, repository=repository)
+
+        if create_n:
+            print_info(f"Created {create_n} labels{in_repository}.")
 
-            value = int(value)
+        if skip_n:
+            print_info(f"Skipped {skip_n} labels{in_repository}.")
 
-            components = {
-                "r": base_color >> 16 & 0xFF,
-                "g": base_color >> 8 & 0xFF,
-                "b": base_color & 0xFF,
+        if state is not None:
+            entry = {
+                "catalog": fingerprint,
+                "count": count + create_n - delete_n,
+                "synchronized_at": time.time(),
             }
 
-            if component in ("h", "s", "v"):
-                h, s, v = rgb_to_hsv(components["r"], components["g"], components["b"])
-                components.update({"h": h, "s": s, "v": v})
+            state.set(repository, entry)
 
-            components[component] = clamp(operator(components[component], value))
+        return (create_n, update_n, delete_n, skip_n)
 
-            if component in ("h", "s", "v"):
-                r, g, b = hsv_to_rgb(components["h"], components["s"], components["v"])
-                components.update({"r": r, "g": g, "b": b})
+    async def apply_repository(repository):
+        in_repository = f" in '{repository}'" if fan_out else ""
 
-            base_color = components["r"] << 16 | components["g"] << 8 | components["b"]
+        owner, name = repository.split("/")
 
-        return base_color
+        entry = applied["repositories"][repository]
 
-    print_info("Populating colors.")
+        print_info(f"Verifying existing labels{in_repository}.")
 
-    while True:
-        fails = 0
-        passes = 0
+        started = time.perf_counter()
 
-        for (key, value) in colors.items():
-            if isinstance(value, int):
-                continue
+        if resume:
+            names = sorted({name for (name, _) in entry["create"]} | {name for (name, _) in entry["delete"]})
+        else:
+            names = list()
+
+        found = set()
+
+        for i in range(0, max(len(names), 1), 100):
+            chunk = names[i : i + 100]
+            variables = {f"name{j}": name_ for (j, name_) in enumerate(chunk)}
 
             try:
-                value = get_color(value, colors)
-            except TypeError as e:
-                fails += 1
-            else:
-                passes += 1
-                colors[key] = value
+                data = await client.request(_state_query(len(chunk)), owner=owner, name=name, **variables)
+            except graphql.client.ClientResponseError as e:
+                print_fatal(f"The request to fetch the repository '{repository}' failed.", e)
+                return None
 
-        if not passes and fails:
-            keys = [key for (key, value) in colors.items() if not isinstance(value, int)]
-            print_fatal(f"The color keys {keys} are recursive.")
-            return 1
-        elif not fails:
-            break
+            try:
+                repository_id = data["repository"]["id"]
+                count = data["repository"]["labels"]["totalCount"]
+            except (KeyError, TypeError) as e:
+                print_fatal(f"The repository '{repository}' does not exist or the token you provided cannot see it.", e)
+                return None
 
-    default_color = defaults.get("color", None)
-    if default_color:
-        try:
-            default_color = get_color(default_color, colors)
-        except BaseException as e:
-            print_fatal(f"The default color requests color '{default_color}' which is not valid", e)
-            return 1
+            found.update(name_ for (j, name_) in enumerate(chunk) if data["repository"][f"l{j}"] is not None)
 
-    default_description = defaults.get("description", None)
+        if repository_id != entry["id"] or not resume and count != entry["count"]:
+            print_fatal(f"The labels in '{repository}' have changed since the plan was made.")
+            return None
 
-    print_info("Populating requested labels.")
+        if resume:
+            entry["delete"] = [(name_, data) for (name_, data) in entry["delete"] if name_ in found]
+            entry["create"] = [(name_, data) for (name_, data) in entry["create"] if name_ not in found]
 
-    requested_labels = dict()
+        report.record("fetch", started, repository=repository)
 
-    for label_data in labels:
-        label_name = label_data["name"]
+        print_info(f"Updating labels{in_repository}.")
 
-        label_color = label_data["color"] or default_color
+        started = time.perf_counter()
 
-        if label_color is None:
-            if not partial:
-                print_fatal(f"The label '{label_name}' does not have a color and no default was provided.")
-                return 1
-        else:
-            if isinstance(label_color, str):
-                try:
-                    label_color = get_color(label_color, colors)
-                except BaseException as e:
-                    print_fatal(f"The label '{label_name}' requests color '{label_color}' which is not valid.", e)
-                    return 1
+        update_n = await run_mutations(MUTATE_LABEL_UPDATE, entry["update"], "update", "Updating", repository, in_repository)
+        if update_n is None:
+            return None
 
-        label_description = label_data["description"] or default_description
+        report.record("update", started, repository=repository)
 
-        requested_labels[label_name] = {
-            "color": f"{label_color:>06X}" if label_color else None,
-            "description": label_description,
-        }
+        return await finish_repository(repository, in_repository, count, update_n, entry["delete"], entry["create"], entry["skipped"])
 
-    for group_data in groups:
-        group_name = group_data["name"]
-        group_color = group_data["color"]
-        group_description = group_data["description"]
-        group_labels = group_data["labels"]
+    async def sync_repository(repository):
+        in_repository = f" in '{repository}'" if fan_out else ""
+
+        owner, name = repository.split("/")
 
-        if group_name:
-            group_prefix_length = 1
-            group_prefix = group_name[:group_prefix_length]
-            while any(g["name"].startswith(group_prefix) for g in groups if g["name"] and g["name"] != group_name and g["labels"]):
-                group_prefix_length += 1
-                group_prefix = group_name[:group_prefix_length]
+        if state is not None:
+            if await verify_repository(repository, state.get(repository)):
+                print_info(f"Skipped {len(requested_labels)} labels{in_repository}, which have not changed since the last run.")
+                return (0, 0, 0, len(requested_labels))
 
-                if group_prefix == group_name:
-                    break
+            if plan is None:
+                state.remove(repository)
+
+        print_info(f"Populating existing labels{in_repository}.")
+
+        started = time.perf_counter()
+
+        data = None
+
+        if reader is not None:
+            data = await reader.get(repository)
+
+        if data is not None:
+            data = {"repository": data}
         else:
-            group_prefix = None
+            try:
+                data = await client.request(QUERY_REPOSITORY, owner=owner, name=name, **fields)
+            except graphql.client.ClientResponseError as e:
+                print_fatal(f"The request to fetch the repository '{repository}' failed.", e)
+                return None
 
-        for label_data in group_labels:
-            label_name = label_data["name"]
+        try:
+            repository_id = data["repository"]["id"]
+        except (KeyError, TypeError) as e:
+            print_fatal(f"The repository '{repository}' does not exist or the token you provided cannot see it.", e)
+            return None
 
-            label_color = label_data["color"] or group_color or default_color
+        if plan is not None:
+            print_info(f"Planning labels{in_repository}.")
+        elif not audit:
+            print_info(f"Updating labels{in_repository}.")
 
-            if label_color is None:
-                if not partial:
-                    print_fatal(f"The label '{label_name}' in group '{group_name}' does not have a color and no default was provided.")
-                    return 1
-            else:
-                if isinstance(label_color, str):
-                    try:
-                        label_color = get_color(label_color, colors)
-                    except BaseException as e:
-                        print_fatal(f"The label '{label_name}' in group '{group_name}' requests color '{label_color}' which is not valid.", e)
-                        return 1
+        existing_labels = dict()
 
-            label_description = label_data["description"] or group_description or default_description
+        skip_n = 0
 
-            if group_prefix:
-                label_name = f"{group_prefix}:{label_name}"
+        async with _Dispatcher(concurrency=concurrency) as dispatcher:
+            futures = list()
+            labels = list()
 
-            if label_name in requested_labels.keys():
-                print_fatal(f"The group '{group_name}' defines label '{label_name}' which already exists.")
-                return 1
+            try:
+                async for nodes in _follow_labels(client, data["repository"]["labels"], repository_id, fields=fields):
+                    page = [Label(node["name"], color=node.get("color"), description=node.get("description"), id=node["id"]) for node in nodes]
 
-            requested_labels[label_name] = {
-                "color": f"{label_color:>06X}" if label_color else None,
-                "description": label_description,
-            }
+                    for label in page:
+                        existing_labels[label.name] = label
 
-    print_info("Authenticating to GitHub.")
+                    update, skip_n_ = _get_update_inputs(catalog, page, partial=partial)
+                    labels.extend(update)
+                    skip_n += skip_n_
 
-    headers = {
-        "Accept": "application/vnd.github.bane-preview+json",
-        "Authorization": f"bearer {token}",
-        "User-Agent": f"ShineyDev/sync-labels-action @ {repository}",
-    }
+                    if plan is None and not audit:
+                        n = len(labels) - len(labels) % batch_size
+                        futures.extend(submit_mutations(dispatcher, MUTATE_LABEL_UPDATE, labels[:n]))
+                        labels = labels[n:]
+            except graphql.client.ClientResponseError as e:
+                print_fatal(f"The request to fetch the labels for '{repository}' failed.", e)
+                return None
 
-    async with aiohttp.ClientSession(headers=headers) as session:
-        client = graphql.client.Client(session=session, url="https://api.github.com/graphql")
+            report.record("fetch", started, repository=repository)
 
-        owner, name = repository.split("/")
+            started = time.perf_counter()
 
-        try:
-            data = await client.request(QUERY_REPOSITORY_ID, owner=owner, name=name)
-        except graphql.client.ClientResponseError as e:
-            print_fatal("The request to fetch your repository identifier failed.", e)
-            return 1
+            diff = diff_labels(catalog, existing_labels, repository_id, partial=partial, detect_renames=detect_renames, updates=False)
 
-        try:
-            repository_id = data["repository"]["id"]
-        except KeyError as e:
-            print_fatal("The repository you provided does not exist or the token you provided cannot see it.", e)
-            return 1
+            if not audit:
+                for (old_name, new_name) in diff.renamed.items():
+                    print_info(f"Renaming label '{old_name}' to '{new_name}'{in_repository}.")
 
-        print_info("Populating existing labels.")
+            labels.extend(diff.update)
+            delete_labels = diff.delete
+            create_labels = diff.create
 
-        existing_labels = dict()
+            if audit:
+                report.record_divergences(update=labels, delete=delete_labels, create=create_labels, renamed=diff.renamed)
+
+                print_info(f"Found {len(create_labels)} missing, {len(labels)} mismatched, and {len(delete_labels)} extra labels{in_repository}.")
+
+                return (len(create_labels), len(labels), len(delete_labels), skip_n)
+
+            if plan is not None:
+                entry = {
+                    "id": repository_id,
+                    "count": len(existing_labels),
+                    "cost": sum(-(-len(labels_) // batch_size) for labels_ in (labels, delete_labels, create_labels)),
+                    "update": labels,
+                    "delete": delete_labels,
+                    "create": create_labels,
+                    "skipped": skip_n,
+                }
+
+                plan["repositories"][repository] = entry
+
+                print_info(f"Planned {len(labels)} updates, {len(delete_labels)} deletions, and {len(create_labels)} creations{in_repository}.")
+
+                return (len(create_labels), len(labels), len(delete_labels), skip_n)
+
+            futures.extend(submit_mutations(dispatcher, MUTATE_LABEL_UPDATE, labels))
+
+            update_n = await report_mutations(futures, "update", "Updating", repository, in_repository)
+            if update_n is None:
+                return None
 
-        cursor = None
-        has_next_page = True
+        report.record("update", started, repository=repository)
 
-        while has_next_page:
+        return await finish_repository(repository, in_repository, len(existing_labels), update_n, delete_labels, create_labels, skip_n)
+
+    async def sync_all(sync, repositories):
+        async def run(repository):
             try:
-                data = await client.request(QUERY_REPOSITORY_LABELS_PAGE, cursor=cursor, repository_id=repository_id)
-            except graphql.client.ClientResponseError as e:
-                print_fatal("The request to fetch your repository labels failed.", e)
-                return 1
+                return await sync(repository)
+            except Exception as e:
+                print_fatal(f"Failed to synchronize '{repository}'.", e)
+                return None
 
-            for label in data["node"]["labels"]["nodes"]:
-                existing_labels[label.pop("name")] = label
+        if not fan_out:
+            counts = await run(repositories[0])
+            report.record_counts(repositories[0], counts)
 
-            cursor = data["node"]["labels"]["pageInfo"]["endCursor"]
-            has_next_page = data["node"]["labels"]["pageInfo"]["hasNextPage"]
+            return [(repositories[0], counts)]
 
-        print_info("Updating labels.")
+        print_info(f"{'Auditing' if audit else 'Planning' if plan is not None else 'Updating'} {len(repositories)} repositories.")
 
-        if partial:
-            print_info("Skipped delete flow.")
-        else:
-            delete_n = 0
-            for name in sorted(existing_labels.keys() - requested_labels.keys()):
-                data = {"id": existing_labels[name]["id"]}
+        async with _Dispatcher(concurrency=repository_concurrency) as dispatcher:
+            futures = [(repository, dispatcher.submit(run, repository)) for repository in repositories]
 
-                print_info(f"Deleting label '{name}'...", end="")
+            results = list()
+            for (repository, future) in futures:
+                counts = await future
+                report.record_counts(repository, counts)
 
-                try:
-                    await client.request(MUTATE_LABEL_DELETE, input=data)
-                except graphql.client.ClientResponseError as e:
-                    print_fatal(f"The request to delete label '{name}' failed.", e)
-                    return 1
+                results.append((repository, counts))
 
-                delete_n += 1
-                print_info("done")
+        return results
 
-            if delete_n:
-                print_info(f"Deleted {delete_n} labels.")
+    if journal is not None and applied is None:
+        plan = {"version": version, "partial": partial, "catalog": fingerprint, "repositories": dict()}
 
-        update_n = 0
-        skip_n = 0
-        for name in sorted(existing_labels.keys() & requested_labels.keys()):
-            existing_data = existing_labels[name]
-            requested_data = requested_labels[name]
+        journal.open()
 
-            data = dict()
+        results = dict(await sync_all(sync_repository, repositories))
 
-            for (key, value) in requested_data.items():
-                if partial and value is None:
-                    pass
-                elif value != existing_data[key]:
-                    data[key] = value
+        applied = plan
+        applied["failed"] = [repository for (repository, counts) in results.items() if counts is None]
+        plan = None
 
-            if data:
-                data["id"] = existing_data["id"]
+        journal.write_plan(applied)
 
-                print_info(f"Updating label '{name}'...", end="")
+        if applied["repositories"]:
+            results.update(await sync_all(apply_repository, list(applied["repositories"].keys())))
 
-                try:
-                    await client.request(MUTATE_LABEL_UPDATE, input=data)
-                except graphql.client.ClientResponseError as e:
-                    print_fatal(f"The request to update label '{name}' failed.", e)
-                    return 1
+        results = list(results.items())
+    else:
+        if journal is not None:
+            journal.open(resume=resume)
 
-                update_n += 1
-                print_info("done")
-            else:
-                skip_n += 1
+            if not resume:
+                journal.write_plan(applied)
 
-        if update_n:
-            print_info(f"Updated {update_n} labels.")
+        results = await sync_all(sync_repository if applied is None else apply_repository, repositories)
 
-        create_n = 0
-        for name in sorted(requested_labels.keys() - existing_labels.keys()):
-            data = requested_labels[name]
-            data["name"] = name
-            data["repositoryId"] = repository_id
+    if audit and report.divergences:
+        print_info("Most common divergences:")
 
-            print_info(f"Creating label '{name}'...", end="")
+        for (divergence, n) in report.divergences.most_common(_AUDIT_DIVERGENCE_N):
+            print_info(f"  {n:>5}  {divergence}")
 
-            try:
-                await client.request(MUTATE_LABEL_CREATE, input=data)
-            except graphql.client.ClientResponseError as e:
-                print_fatal(f"The request to create label '{name}' failed.", e)
-                return 1
+    if not fan_out:
+        code = 0 if results[0][1] else 1
 
-            create_n += 1
-            print_info("done")
+        return fail_uncompared(uncompared) if uncompared else code
 
-        if create_n:
-            print_info(f"Created {create_n} labels.")
+    width = max([len("Repository"), *(len(repository) for repository in repositories)])
+    columns = [key.title() for key in report.counts]
 
-        if skip_n:
-            print_info(f"Skipped {skip_n} labels.")
+    print_info(f"{'Repository':<{width}}  " + "  ".join(f"{column:>7}" for column in columns))
 
-    return 0
+    failed_n = 0
+    for (repository, counts) in results:
+        if counts is None:
+            failed_n += 1
+            print_info(f"{repository:<{width}}  failed")
+        else:
+            print_info(f"{repository:<{width}}  " + "  ".join(f"{n:>{max(len(column), 7)}}" for (column, n) in zip(columns, counts)))
+
+    if failed_n:
+        print_fatal(f"Failed to {'audit' if audit else 'plan' if plan is not None else 'update'} {failed_n} of {len(repositories)} repositories.")
+        code = 1
+    else:
+        code = 0
+
+    return fail_uncompared(uncompared) if uncompared else code
 
 
-async def main_catchall(*args, **kwargs):
+async def main_catchall(*args, journal_path, plan_path, report_path, state_path, summary, timeout, **kwargs):
+    journal = _Journal(journal_path) if journal_path else None
+    plan = {"version": version, "repositories": dict()} if plan_path else None
+    report = _Report(audit=kwargs["audit"], plan=bool(plan_path))
+    state = _State(state_path) if state_path else None
+
     try:
-        code = await main(*args, **kwargs)
+        connections = kwargs["concurrency"] * kwargs["repository_concurrency"]
+
+        async with _create_session(connections=connections, report=report, timeout=timeout) as session:
+            code = await main(*args, journal=journal, plan=plan, report=report, session=session, state=state, **kwargs)
     except BaseException as e:
         print_fatal(e)
         code = 1
     finally:
+        if journal is not None:
+            journal.close()
+
+        try:
+            if report_path:
+                with open(report_path, "w") as stream:
+                    json.dump(report.to_dict(), stream, indent=2)
+
+            if summary and os.environ.get("GITHUB_STEP_SUMMARY"):
+                with open(os.environ["GITHUB_STEP_SUMMARY"], "a") as stream:
+                    stream.write(report.to_markdown())
+        except OSError as e:
+            print_warning("Failed to write the report.", e)
+
+        if plan is not None and code == 0:
+            plan["cost"] = sum(entry["cost"] for entry in plan["repositories"].values())
+
+            try:
+                with open(plan_path, "w") as stream:
+                    json.dump(plan, stream, indent=2)
+            except OSError as e:
+                print_fatal("Failed to write the plan.", e)
+                code = 1
+
+        if state is not None and plan is None:
+            try:
+                state.save()
+            except (OSError, TypeError, ValueError) as e:
+                print_warning("Failed to write the state.", e)
+
         return code
 
 
@@ -615,6 +2487,7 @@ if __name__ == "__main__":
         description="A Python script for synchronizing your GitHub repository labels with a " "labels.yml file.",
         epilog="See the documentation at <https://docs.shiney.dev/sync-labels-action>.",
         formatter_class=HelpFormatter,
+        fromfile_prefix_chars="@",
     )
 
     class UsageAction(argparse._HelpAction):
@@ -630,23 +2503,177 @@ if __name__ == "__main__":
     parser.add_argument("--usage", action="usage", help=argparse.SUPPRESS)
     parser.add_argument("--version", action="version", help=argparse.SUPPRESS, version=version)
 
+    a = parser.add_argument("--apply", dest="apply_path", metavar="PATH")
+    a.help = "A path to a plan written by --plan to apply instead of reading a source."
+
+    a = parser.add_argument("--audit", action="store_true")
+    a.help = "Reports how the labels of each repository differ from the source, without changing them."
+
+    a = parser.add_argument("--batch-size", default=1, metavar="N", type=int)
+    a.help = "A maximum number of label mutations to send in one request. (default: 1)"
+
+    a = parser.add_argument("--cache", metavar="PATH")
+    a.help = "A path to a directory in which to cache inherited sources."
+
+    a = parser.add_argument("--concurrency", default=1, metavar="N", type=int)
+    a.help = "A maximum number of label mutations to run at once. (default: 1)"
+
+    a = parser.add_argument("--debounce", default=2, metavar="SECONDS", type=float)
+    a.help = "A number of seconds to collect label webhooks for a repository before reconciling it. (default: 2)"
+
+    a = parser.add_argument("--detect-renames", action="store_true")
+    a.help = "Renames labels which would be deleted to labels which would be created with the same color and description."
+
+    a = parser.add_argument("--endpoint", default="https://api.github.com/graphql", metavar="URL")
+    a.help = "A URL to the GitHub GraphQL API. (default: 'https://api.github.com/graphql')"
+
+    a = parser.add_argument("--journal", dest="journal_path", metavar="PATH")
+    a.help = "A path to a file in which to record each label mutation as it is made."
+
+    a = parser.add_argument("--log-format", choices=["json", "text"], default="text")
+    a.help = "A format for output. 'json' writes one JSON object per line. (default: 'text')"
+
+    a = parser.add_argument("--offline", action="store_true")
+    a.help = "Reads inherited sources from the cache only."
+
     a = parser.add_argument("--partial", action="store_true")
     a.help = "Marks the source as partial."
 
-    a = parser.add_argument("--repository", metavar="OWNER/NAME", required=True)
-    a.help = "A GitHub repository. (example: 'ShineyDev/sync-labels-action')"
+    a = parser.add_argument("--plan", dest="plan_path", metavar="PATH")
+    a.help = "A path to which to write the label mutations to make, without making them."
+
+    a = parser.add_argument("--report", dest="report_path", metavar="PATH")
+    a.help = "A path to which to write a JSON report of phase timings and request counts."
+
+    a = parser.add_argument("--repository", action="extend", dest="repositories", metavar="OWNER/NAME", nargs="+")
+    a.help = "One or more GitHub repositories, or 'OWNER/*' for all of an owner's repositories. (example: 'ShineyDev/sync-labels-action')"
 
-    a = parser.add_argument("--source", metavar="PATH", required=True)
+    a = parser.add_argument("--repository-concurrency", default=1, metavar="N", type=int)
+    a.help = "A maximum number of repositories to synchronize at once. (default: 1)"
+
+    a = parser.add_argument("--resume", action="store_true")
+    a.help = "Makes the label mutations in the journal which were not yet made instead of reading a source."
+
+    a = parser.add_argument("--retries", default=3, metavar="N", type=int)
+    a.help = "A maximum number of times to retry a request that was rate limited or failed transiently. (default: 3)"
+
+    a = parser.add_argument("--serve", metavar="HOST:PORT")
+    a.help = "An address on which to receive label webhooks and reconcile the labels they name, instead of synchronizing once."
+
+    a = parser.add_argument("--source", metavar="PATH")
     a.help = "A path or a URL to the source file. (example: './.github/data/labels.yml')"
 
+    a = parser.add_argument("--state", dest="state_path", metavar="PATH")
+    a.help = "A path to a file in which to record the state of each repository after it is synchronized."
+
+    a = parser.add_argument("--state-interval", default=86400, metavar="SECONDS", type=float)
+    a.help = "A maximum number of seconds to trust the recorded state before synchronizing in full again. (default: 86400)"
+
+    a = parser.add_argument("--summary", action="store_true")
+    a.help = "Appends a Markdown report to the GitHub Actions job summary."
+
+    a = parser.add_argument("--timeout", default=60, metavar="SECONDS", type=float)
+    a.help = "A maximum number of seconds to wait to connect to a host or for data from it. (default: 60)"
+
     a = parser.add_argument("--token", required=True)
     a.help = "A GitHub personal access token with the 'public_repo' scope."
 
     a = parser.add_argument("--verbosity", choices=range(0, 4 + 1), required=True, type=int)
     a.help = "A level of verbosity for output. 0 for none, error, warning, info, and 4 for debug."
 
+    a = parser.add_argument("--webhook-secret", metavar="SECRET")
+    a.help = "A secret with which label webhooks received by --serve must be signed."
+
     kwargs = vars(parser.parse_args())
 
+    if kwargs["journal_path"] and kwargs["plan_path"]:
+        parser.error("argument --journal: not allowed with argument --plan")
+
+    if kwargs["resume"]:
+        if not kwargs["journal_path"]:
+            parser.error("argument --resume: requires --journal")
+
+        if kwargs["apply_path"]:
+            parser.error("argument --resume: not allowed with argument --apply")
+
+        if kwargs["repositories"]:
+            parser.error("argument --resume: not allowed with argument --repository")
+
+        if kwargs["serve"]:
+            parser.error("argument --resume: not allowed with argument --serve")
+
+        if kwargs["source"]:
+            parser.error("argument --resume: not allowed with argument --source")
+    elif kwargs["apply_path"]:
+        if kwargs["plan_path"]:
+            parser.error("argument --apply: not allowed with argument --plan")
+
+        if kwargs["repositories"]:
+            parser.error("argument --apply: not allowed with argument --repository")
+
+        if kwargs["serve"]:
+            parser.error("argument --apply: not allowed with argument --serve")
+
+        if kwargs["source"]:
+            parser.error("argument --apply: not allowed with argument --source")
+    elif kwargs["serve"]:
+        for (option, key) in (("--journal", "journal_path"), ("--plan", "plan_path"), ("--state", "state_path")):
+            if kwargs[key]:
+                parser.error(f"argument --serve: not allowed with argument {option}")
+
+        if not re.fullmatch("[^\\s]*:[0-9]+", kwargs["serve"]):
+            parser.error(f"argument --serve: '{kwargs['serve']}' is not in the form HOST:PORT")
+
+        if not kwargs["source"]:
+            parser.error("the following arguments are required: --source")
+    elif not kwargs["repositories"] or not kwargs["source"]:
+        parser.error("the following arguments are required: --repository, --source")
+
+    if kwargs["audit"]:
+        for (option, key) in (
+            ("--apply", "apply_path"),
+            ("--journal", "journal_path"),
+            ("--plan", "plan_path"),
+            ("--resume", "resume"),
+            ("--serve", "serve"),
+            ("--state", "state_path"),
+        ):
+            if kwargs[key]:
+                parser.error(f"argument --audit: not allowed with argument {option}")
+
+    if kwargs["webhook_secret"] and not kwargs["serve"]:
+        parser.error("argument --webhook-secret: requires --serve")
+
+    if kwargs["debounce"] < 0:
+        parser.error("argument --debounce: must be at least 0")
+
+    if kwargs["batch_size"] < 1:
+        parser.error("argument --batch-size: must be at least 1")
+
+    if kwargs["offline"] and not kwargs["cache"]:
+        parser.error("argument --offline: requires --cache")
+
+    if kwargs["concurrency"] < 1:
+        parser.error("argument --concurrency: must be at least 1")
+
+    if kwargs["repository_concurrency"] < 1:
+        parser.error("argument --repository-concurrency: must be at least 1")
+
+    if kwargs["retries"] < 0:
+        parser.error("argument --retries: must be at least 0")
+
+    if kwargs["state_interval"] < 0:
+        parser.error("argument --state-interval: must be at least 0")
+
+    if kwargs["timeout"] <= 0:
+        parser.error("argument --timeout: must be greater than 0")
+
+    for repository in kwargs["repositories"] or list():
+        if not re.fullmatch("[^/\\s]+/[^/\\s]+", repository):
+            parser.error(f"argument --repository: '{repository}' is not in the form OWNER/NAME")
+
+    _output.format = kwargs.pop("log_format")
+
     verbosity = kwargs.pop("verbosity")
     for printer in _printers:
         if verbosity >= printer.level: